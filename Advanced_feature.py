@@ -12,10 +12,14 @@ import random
 import os
 import datetime
 import cv2
+from weather_engine import WeatherEngine
+from actor_cleanup import ActorCleanup
 
 # Initialize CARLA client
 client = carla.Client('localhost', 2000)
 client.set_timeout(10.0)
+actor_cleanup = ActorCleanup(client)
+actor_cleanup.install_handlers()
 
 available_towns = ['Town01', 'Town02', 'Town03', 'Town04', 'Town05']
 town_index = 1  # Start from Town02
@@ -28,6 +32,7 @@ walker_controllers = []
 cameras = []
 camera_surfaces = [None] * 5
 recordings = [None] * 5
+weather_engine = None
 
 # Create a directory for this recording session
 session_time = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -35,37 +40,24 @@ os.makedirs(f"recordings/{session_time}", exist_ok=True)
 
 def reload_town():
     global world, blueprints, spawn_points, spawn_point
-    global vehicle, av_vehicles, walkers, walker_controllers, cameras, recordings
+    global vehicle, av_vehicles, walkers, walker_controllers, cameras, recordings, weather_engine
 
     print("[Town Reload] Cleaning up actors...")
 
-    for cam in cameras:
-        if cam:
-            cam.stop()
-            cam.destroy()
+    # Sensors are stopped here, before their video writers are released
+    actor_cleanup.destroy_all("Town Reload")
     cameras.clear()
-
-    for rec in recordings:
-        if rec:
-            rec.release()
-    recordings = [None] * 5
-
-    for c in walker_controllers:
-        c.stop()
-        c.destroy()
     walker_controllers.clear()
-
-    for w in walkers:
-        w.destroy()
     walkers.clear()
-
-    for av in av_vehicles:
-        av.destroy()
     av_vehicles.clear()
+    vehicle = None
 
-    if vehicle:
-        vehicle.destroy()
-        vehicle = None
+    for rec in recordings:
+        if rec:
+            rec.release()
+    # Reset in place: make_camera and its callbacks hold the same lists
+    recordings[:] = [None] * 5
+    camera_surfaces[:] = [None] * 5
 
     town_index = (reload_town.index + 1) % len(available_towns)
     reload_town.index = town_index
@@ -75,6 +67,8 @@ def reload_town():
     blueprints = world.get_blueprint_library()
     spawn_points = world.get_map().get_spawn_points()
     spawn_point = spawn_points[0] if spawn_points else carla.Transform()
+    if weather_engine:
+        weather_engine.set_world(world)
     print("[Town Reload] Loaded successfully.")
 
 reload_town.index = town_index
@@ -86,7 +80,7 @@ vehicle_bp = blueprints.find('vehicle.tesla.model3')
 spawn_point = spawn_points[0]
 
 # Spawn Ego Vehicle
-vehicle = world.try_spawn_actor(vehicle_bp, spawn_point)
+vehicle = actor_cleanup.track(world.try_spawn_actor(vehicle_bp, spawn_point))
 vehicle.set_autopilot(False)
 
 # Create RGB Cameras
@@ -95,7 +89,7 @@ def make_camera(transform, index, width, height):
     bp.set_attribute('image_size_x', str(width))
     bp.set_attribute('image_size_y', str(height))
     bp.set_attribute('fov', '90')
-    cam = world.spawn_actor(bp, transform, attach_to=vehicle)
+    cam = actor_cleanup.track(world.spawn_actor(bp, transform, attach_to=vehicle))
 
     filename = f"recordings/{session_time}/camera_{index}.avi"
     fourcc = cv2.VideoWriter_fourcc(*'XVID')
@@ -146,7 +140,7 @@ weather_presets = [
     carla.WeatherParameters.SoftRainNoon,
     carla.WeatherParameters.ClearSunset
 ]
-weather_index = 0
+weather_engine = WeatherEngine(world, weather_presets, transition=10.0, update_hz=2.0)
 
 reverse_mode = False
 clock = pygame.time.Clock()
@@ -158,7 +152,7 @@ random.shuffle(spawn_points)
 for i in range(30):
     if i + 1 < len(spawn_points):
         bp = random.choice(vehicle_bps)
-        av = world.try_spawn_actor(bp, spawn_points[i + 1])
+        av = actor_cleanup.track(world.try_spawn_actor(bp, spawn_points[i + 1]))
         if av:
             av.set_autopilot(True)
             av_vehicles.append(av)
@@ -171,9 +165,9 @@ walker_spawn_points = [carla.Transform(world.get_random_location_from_navigation
 
 for i in range(10):
     walker_bp = random.choice(walker_bps)
-    walker = world.try_spawn_actor(walker_bp, walker_spawn_points[i])
+    walker = actor_cleanup.track(world.try_spawn_actor(walker_bp, walker_spawn_points[i]))
     if walker:
-        controller = world.try_spawn_actor(walker_controller_bp, carla.Transform(), attach_to=walker)
+        controller = actor_cleanup.track(world.try_spawn_actor(walker_controller_bp, carla.Transform(), attach_to=walker))
         if controller:
             controller.start()
             controller.go_to_location(world.get_random_location_from_navigation())
@@ -193,13 +187,13 @@ try:
                 running = False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_w:
-                    weather_index = (weather_index + 1) % len(weather_presets)
-                    world.set_weather(weather_presets[weather_index])
-                    print(f"[Weather] Changed to preset index: {weather_index}")
+                    weather_index = weather_engine.next_preset()
+                    print(f"[Weather] Blending to preset index: {weather_index}")
                 elif event.key == pygame.K_t:
                     reload_town()
             elif event.type == pygame.JOYBUTTONDOWN and event.button == 1:
                 reverse_mode = not reverse_mode
+        weather_engine.update()
 
         steer = apply_deadzone(joystick.get_axis(0))
         throttle = apply_deadzone((-joystick.get_axis(1) + 1) / 2.0)
@@ -239,19 +233,8 @@ except KeyboardInterrupt:
     running = False
 
 finally:
-    for cam in cameras:
-        cam.stop()
-        cam.destroy()
+    actor_cleanup.destroy_all()
     for rec in recordings:
         if rec:
             rec.release()
-    if vehicle:
-        vehicle.destroy()
-    for av in av_vehicles:
-        av.destroy()
-    for c in walker_controllers:
-        c.stop()
-        c.destroy()
-    for w in walkers:
-        w.destroy()
     pygame.quit()
@@ -1,124 +1,164 @@
+import time
+import_start = time.perf_counter()  # --profile-startup counts the imports below too
+
 import carla
 import pygame
 import sys
-import numpy as np
+import math
 import random
 import os
 import datetime
-import cv2
-import csv
-
-# Ask for driver name
-driver_name = input("Enter driver name: ")
+import json
+import argparse
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from startup_profile import StartupProfiler
+from scenario_config import load_scenario
+from weather_engine import WeatherEngine
+from actor_cleanup import ActorCleanup
+from session_recorder import EGO_ROLE_NAME, SessionRecorder
+from ego_unit import EgoUnit
+from resource_tracker import MIN_SOAK_CYCLES, ResourceTracker
+imports_done = time.perf_counter()
+
+parser = argparse.ArgumentParser(description="CARLA manual drive")
+parser.add_argument('--scenario', help="scenario JSON file (see scenarios/)")
+parser.add_argument('--driver', help="driver name (prompted for if omitted)")
+parser.add_argument('--profile-startup', action='store_true', help="print a per-phase startup time breakdown")
+parser.add_argument('--resource-interval', type=float, default=60.0, help="seconds between resource samples, 0 to disable")
+parser.add_argument('--tracemalloc', action='store_true', help="include top growing allocation sites in resource samples")
+parser.add_argument('--soak', type=int, default=0, metavar='N', help="reload the town N times, then fail if resources grew")
+parser.add_argument('--soak-dwell', type=float, default=20.0, help="seconds to drive each town in soak mode")
+args = parser.parse_args()
+if 0 < args.soak < MIN_SOAK_CYCLES:
+    parser.error(f"--soak needs at least {MIN_SOAK_CYCLES} reloads to tell a leak from noise")
+scenario = load_scenario(args.scenario)
+
+startup = StartupProfiler(origin=import_start)
+startup.record("imports", import_start, imports_done)
+
+# Cheap preconditions first, so a missing wheel doesn't cost a world load
+with startup.phase("joystick check"):
+    # Keep wheel input flowing while the window is unfocused. With the pygame
+    # backend axis state still only refreshes when the main loop pumps events;
+    # see input_poller.py
+    os.environ.setdefault('SDL_JOYSTICK_ALLOW_BACKGROUND_EVENTS', '1')
+    pygame.init()
+    pygame.joystick.init()
+
+    joysticks = {}
+    for ego in scenario['egos']:
+        if ego['control'] != 'joystick':
+            continue
+        if ego['joystick'] >= pygame.joystick.get_count():
+            print(f"No joystick detected for {ego['name']} (index {ego['joystick']}, {pygame.joystick.get_count()} connected).")
+            pygame.quit()
+            sys.exit(1)
+        joystick = pygame.joystick.Joystick(ego['joystick'])
+        joystick.init()
+        joysticks[ego['name']] = joystick
+        print(f"Detected joystick for {ego['name']}: {joystick.get_name()}")
+
+horn_path = 'horn.wav'
+if not os.path.exists(horn_path):
+    print(f"[WARN] {horn_path} not found, horn disabled.")
+    horn_path = None
+
+# Ask for driver names once the hardware checks have passed; the first
+# joystick ego can also take --driver
+with startup.phase("driver prompt"):
+    driver_names = []
+    for i, ego in enumerate(scenario['egos']):
+        if ego['driver']:
+            driver_names.append(ego['driver'])
+        elif i == 0 and args.driver:
+            driver_names.append(args.driver)
+        elif len(scenario['egos']) == 1:
+            driver_names.append(input("Enter driver name: "))
+        else:
+            driver_names.append(input(f"Enter driver name for {ego['name']}: "))
 
 # Initialize CARLA client
 client = carla.Client('localhost', 2000)
 client.set_timeout(10.0)
+actor_cleanup = ActorCleanup(client)
+actor_cleanup.install_handlers()
 
 available_towns = ['Town01', 'Town02', 'Town03', 'Town04', 'Town05']
-town_index = 4 # Change according to your town need
+if scenario['town'] not in available_towns:
+    available_towns.append(scenario['town'])
+town_index = available_towns.index(scenario['town'])
 
-vehicle = None
 av_vehicles = []
 walkers = []
 walker_controllers = []
-cameras = []
-camera_surfaces = [None] * 5
-recordings = [None] * 5
-collision_sensor = None
+weather_engine = None
 running = True
-reverse_mode = False
 
 # Session path
 session_time = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 session_path = f"recordings/{session_time}"
 os.makedirs(session_path, exist_ok=True)
-
-# Log files
-log_file_path = os.path.join(session_path, "drive_log.csv")
-log_file = open(log_file_path, mode='w', newline='')
-log_writer = csv.writer(log_file)
-log_writer.writerow(["Driver", "Timestamp", "Speed_kmh", "Throttle", "Brake"])
-
-collision_log_path = os.path.join(session_path, "collision_log.csv")
-collision_file = open(collision_log_path, mode='w', newline='')
-collision_writer = csv.writer(collision_file)
-collision_writer.writerow(["Driver", "Timestamp", "Other Actor", "Location X", "Location Y", "Location Z"])
-
-def on_collision(event):
-    global vehicle
-    other_actor = event.other_actor
-    location = vehicle.get_location()
-    timestamp = datetime.datetime.now().strftime("%H:%M:%S.%f")
-    collision_writer.writerow([driver_name, timestamp, other_actor.type_id, location.x, location.y, location.z])
-    print(f"[COLLISION] with {other_actor.type_id} at ({location.x:.2f}, {location.y:.2f}, {location.z:.2f})")
-
-weather_presets = [
-    carla.WeatherParameters.ClearNoon,
-    carla.WeatherParameters.CloudyNoon,
-    carla.WeatherParameters.WetNoon,
-    carla.WeatherParameters.MidRainyNoon,
-    carla.WeatherParameters.SoftRainNoon,
-    carla.WeatherParameters.ClearSunset
-]
-weather_index = 0
+with open(os.path.join(session_path, "scenario.json"), 'w') as f:
+    json.dump(scenario, f, indent=2)
+
+# One unit per participant; a single ego keeps its logs directly in the session folder
+egos = []
+for i, ego in enumerate(scenario['egos']):
+    log_dir = session_path if len(scenario['egos']) == 1 else os.path.join(session_path, ego['name'])
+    role_name = EGO_ROLE_NAME if i == 0 else f"{EGO_ROLE_NAME}_{i}"
+    egos.append(EgoUnit(ego['name'], driver_names[i], log_dir, scenario, actor_cleanup, role_name,
+                        ego['control'], joysticks.get(ego['name'])))
+
+# Compact server-side capture of every actor; replay_session.py re-renders it offline
+session_recorder = SessionRecorder(
+    client, session_path, scenario['carla_recorder'],
+    driver=driver_names[0],
+    scenario=scenario['name'],
+    sensors=scenario['sensors'],
+    egos=[{'name': ego.name, 'driver': ego.driver_name, 'role_name': ego.role_name,
+           'log_dir': os.path.relpath(ego.log_dir, session_path)} for ego in egos],
+    logs=["drive_log.csv", "collision_log.csv", "near_miss_log.csv"]
+)
+
+# Live object counts per session, sampled on an interval and before every soak reload
+resource_tracker = ResourceTracker(os.path.join(session_path, "resources.csv"), args.resource_interval, args.tracemalloc)
+resource_tracker.add_counter('tracked_actors', lambda: len(actor_cleanup.actors))
+resource_tracker.add_counter('server_actors', lambda: len(world.get_actors()))
+resource_tracker.add_counter('sensors', lambda: sum(len(ego.cameras) + (1 if ego.collision_sensor else 0) for ego in egos))
+resource_tracker.add_counter('video_writers', lambda: sum(1 for ego in egos for rec in ego.recordings if rec))
+resource_tracker.add_counter('surfaces', lambda: sum(1 for ego in egos for surface in ego.camera_surfaces if surface))
+resource_tracker.add_counter('threads', threading.active_count)
+
+weather_presets = [getattr(carla.WeatherParameters, name) for name in scenario['weather']['presets']]
 
 def reload_world(town_name):
-    global world, vehicle, cameras, camera_surfaces, recordings, collision_sensor, blueprints, spawn_points
-
-    world = client.load_world(town_name)
-    blueprints = world.get_blueprint_library()
-    spawn_points = world.get_map().get_spawn_points()
-
-    if vehicle:
-        vehicle.destroy()
-    if collision_sensor:
-        collision_sensor.stop()
-        collision_sensor.destroy()
-    for cam in cameras:
-        cam.stop()
-        cam.destroy()
-    cameras.clear()
-    camera_surfaces[:] = [None] * 5
-    recordings[:] = [None] * 5
-
-    vehicle_bp = blueprints.find('vehicle.tesla.model3')
-    spawn_point = spawn_points[0] if spawn_points else carla.Transform()
-    vehicle = world.try_spawn_actor(vehicle_bp, spawn_point)
-    if vehicle:
-        vehicle.set_autopilot(False)
-        col_sensor_bp = blueprints.find('sensor.other.collision')
-        collision_sensor = world.spawn_actor(col_sensor_bp, carla.Transform(), attach_to=vehicle)
-        collision_sensor.listen(on_collision)
-
-        make_camera(carla.Transform(carla.Location(x=1.5, z=1.5)), 0, 800, 600)
-        make_camera(carla.Transform(carla.Location(x=-2.5, z=1.5), carla.Rotation(yaw=180)), 1, 400, 300)
-        make_camera(carla.Transform(carla.Location(y=-1.5, z=1.5), carla.Rotation(yaw=-90)), 2, 400, 300)
-        make_camera(carla.Transform(carla.Location(y=1.5, z=1.5), carla.Rotation(yaw=90)), 3, 400, 300)
-        make_camera(carla.Transform(carla.Location(z=50), carla.Rotation(pitch=-90)), 4, 400, 300)
-
-def make_camera(transform, index, width, height):
-    global cameras, camera_surfaces, recordings
-    bp = blueprints.find('sensor.camera.rgb')
-    bp.set_attribute('image_size_x', str(width))
-    bp.set_attribute('image_size_y', str(height))
-    bp.set_attribute('fov', '90')
-    cam = world.spawn_actor(bp, transform, attach_to=vehicle)
-
-    filename = f"{session_path}/camera_{index}.avi"
-    fourcc = cv2.VideoWriter_fourcc(*'XVID')
-    out = cv2.VideoWriter(filename, fourcc, 20.0, (width, height))
-    recordings[index] = out
-
-    def callback(image):
-        image.convert(carla.ColorConverter.Raw)
-        array = np.frombuffer(image.raw_data, dtype=np.uint8).reshape((image.height, image.width, 4))
-        rgb_array = array[:, :, :3][:, :, ::-1]
-        camera_surfaces[index] = pygame.surfarray.make_surface(rgb_array.swapaxes(0, 1))
-        out.write(rgb_array)
-
-    cam.listen(callback)
-    cameras.append(cam)
+    global world, blueprints, spawn_points, weather_engine, last_server_frame
+
+    # Actors still alive from the previous town are batch-destroyed before the load
+    actor_cleanup.destroy_all("Town Reload")
+    session_recorder.stop_segment()
+
+    with startup.phase("load_world"):
+        world = client.load_world(town_name)
+    last_server_frame = None
+    session_recorder.start_segment(town_name)
+    with startup.phase("blueprint lookup"):
+        blueprints = world.get_blueprint_library()
+        # One OpenDRIVE fetch per load, shared by spawn points and every ego's BEV renderer
+        world_map = world.get_map()
+        spawn_points = world_map.get_spawn_points()
+    if weather_engine:
+        weather_engine.set_world(world)
+    else:
+        weather_engine = WeatherEngine(world, weather_presets, scenario['weather']['interval'],
+                                       scenario['weather']['transition'], scenario['weather']['update_hz'])
+
+    with startup.phase("ego sensors"):
+        for i, ego in enumerate(egos):
+            spawn_point = spawn_points[i] if i < len(spawn_points) else carla.Transform()
+            ego.spawn(world, world_map, blueprints, spawn_point)
 
 def spawn_av_and_pedestrians():
     global av_vehicles, walkers, walker_controllers
@@ -130,18 +170,18 @@ def spawn_av_and_pedestrians():
     vehicle_bps = blueprints.filter('vehicle.*')
     pedestrian_bps = blueprints.filter('walker.pedestrian.*')
 
-    available_spawn_points = spawn_points[1:]
+    available_spawn_points = spawn_points[len(egos):]
     random.shuffle(available_spawn_points)
-    for i in range(min(30, len(available_spawn_points))):
+    for i in range(min(scenario['traffic']['vehicles'], len(available_spawn_points))):
         bp = random.choice(vehicle_bps)
         spawn = available_spawn_points[i]
-        av = world.try_spawn_actor(bp, spawn)
+        av = actor_cleanup.track(world.try_spawn_actor(bp, spawn))
         if av:
             av.set_autopilot(True)
             av_vehicles.append(av)
 
     walker_spawn_points = []
-    for _ in range(10):
+    for _ in range(scenario['traffic']['pedestrians']):
         loc = world.get_random_location_from_navigation()
         if loc:
             walker_spawn_points.append(carla.Transform(loc))
@@ -156,109 +196,175 @@ def spawn_av_and_pedestrians():
     walker_ids = [r.actor_id for r in results if not r.error]
 
     for walker_id in walker_ids:
-        walker = world.get_actor(walker_id)
+        walker = actor_cleanup.track(world.get_actor(walker_id))
         if walker:
             walkers.append(walker)
             controller_bp = blueprints.find('controller.ai.walker')
-            controller = world.try_spawn_actor(controller_bp, carla.Transform(), attach_to=walker)
+            controller = actor_cleanup.track(world.try_spawn_actor(controller_bp, carla.Transform(), attach_to=walker))
             if controller:
                 walker_controllers.append(controller)
                 controller.start()
                 controller.go_to_location(world.get_random_location_from_navigation())
                 controller.set_max_speed(1 + random.random())
 
-reload_world(available_towns[town_index])
-spawn_av_and_pedestrians()
-
-# Pygame setup
-pygame.init()
-pygame.joystick.init()
-
-if pygame.joystick.get_count() == 0:
-    print("No joystick detected.")
-    pygame.quit()
-    sys.exit(1)
-
-joystick = pygame.joystick.Joystick(0)
-joystick.init()
-print(f"Detected joystick: {joystick.get_name()}")
-
-screen = pygame.display.set_mode((1200, 900))
-pygame.display.set_caption("CARLA Manual Drive")
-font = pygame.font.SysFont(None, 36)
-pygame.mouse.set_visible(False)
-
-pygame.mixer.init()
-horn_sound = pygame.mixer.Sound('horn.wav')
-
-def apply_deadzone(value, deadzone=0.1):
-    return 0.0 if abs(value) < deadzone else value
+def load_initial_world():
+    if scenario['record_video']:
+        # Otherwise paid inside "ego sensors"; skipped entirely when video is off
+        with startup.phase("cv2 import"):
+            importlib.import_module('cv2')
+    reload_world(available_towns[town_index])
+    with startup.phase("traffic"):
+        spawn_av_and_pedestrians()
+
+# The world loads on a worker thread while the window and mixer open here;
+# pygame's display has to stay on the main thread
+startup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="world-load")
+world_ready = startup_executor.submit(load_initial_world)
+
+with startup.phase("window + mixer"):
+    screen = pygame.display.set_mode((1200, 900))
+    pygame.display.set_caption("CARLA Manual Drive")
+    font = pygame.font.SysFont(None, 36)
+    pygame.mouse.set_visible(False)
+
+    pygame.mixer.init()
+    horn_sound = pygame.mixer.Sound(horn_path) if horn_path else None
+
+with startup.phase("wait for world"):
+    world_ready.result()
+startup_executor.shutdown()
+startup.finish()  # town reloads later in the session are not startup phases
+if args.profile_startup:
+    startup.report()
+
+for ego in egos:
+    ego.start()
+
+def ego_for_joystick(instance_id):
+    for ego in egos:
+        if ego.joystick is not None and ego.joystick.get_instance_id() == instance_id:
+            return ego
+    return None
+
+def draw_rig(ego):
+    camera_surfaces = ego.camera_surfaces
+    if camera_surfaces[0]:
+        screen.blit(camera_surfaces[0], (0, 0))
+        screen.blit(font.render("Front Camera", True, (255, 255, 0)), (300, 10))
+        screen.blit(font.render(f"Speed: {ego.speed_kmh:.1f} km/h", True, (255, 255, 255)), (10, 40))
+        screen.blit(font.render(f"Hi,Virtual Driver: {ego.driver_name}", True, (0, 255, 0)), (10, 80))
+
+    if camera_surfaces[1]:
+        screen.blit(camera_surfaces[1], (800, 0))
+        screen.blit(font.render("Rear Camera", True, (255, 255, 0)), (1000, 10))
+    if camera_surfaces[2]:
+        screen.blit(camera_surfaces[2], (800, 300))
+        screen.blit(font.render("Left Camera", True, (255, 255, 0)), (1000, 310))
+    if camera_surfaces[3]:
+        screen.blit(camera_surfaces[3], (800, 600))
+        screen.blit(font.render("Right Camera", True, (255, 255, 0)), (1000, 610))
+    if camera_surfaces[4]:
+        screen.blit(camera_surfaces[4], (0, 600))
+        screen.blit(font.render("BEV Camera", True, (255, 255, 0)), (300, 610))
+
+    overlay = font.render(f"Gear: {'REVERSE' if ego.reverse_mode else 'DRIVE'}", True, (255, 255, 255))
+    screen.blit(overlay, (10, 10))
+    threat_text = ego.proximity_monitor.hud_text()
+    if threat_text:
+        screen.blit(font.render(threat_text, True, (255, 80, 80)), (10, 120))
+
+def draw_split(egos):
+    # Split screen: each ego's front camera scaled into its own pane
+    cols = math.ceil(math.sqrt(len(egos)))
+    rows = math.ceil(len(egos) / cols)
+    width, height = screen.get_width() // cols, screen.get_height() // rows
+    for i, ego in enumerate(egos):
+        x, y = (i % cols) * width, (i // cols) * height
+        if ego.camera_surfaces[0]:
+            screen.blit(pygame.transform.scale(ego.camera_surfaces[0], (width, height)), (x, y))
+        lines = [(f"{ego.name}: {ego.driver_name}", (0, 255, 0)),
+                 (f"Speed: {ego.speed_kmh:.1f} km/h  Gear: {'REVERSE' if ego.reverse_mode else 'DRIVE'}", (255, 255, 255))]
+        threat_text = ego.proximity_monitor.hud_text()
+        if threat_text:
+            lines.append((threat_text, (255, 80, 80)))
+        for n, (text, color) in enumerate(lines):
+            screen.blit(font.render(text, True, color), (x + 10, y + 10 + 30 * n))
+        pygame.draw.rect(screen, (80, 80, 80), (x, y, width, height), 1)
+
+def change_town(step=1):
+    global town_index
+    town_index = (town_index + step) % len(available_towns)
+    print(f"[Town] {'Reloading' if step == 0 else 'Changing to'} {available_towns[town_index]}")
+    reload_world(available_towns[town_index])
+    spawn_av_and_pedestrians()
 
 clock = pygame.time.Clock()
+episode_start = time.time()
+soak_cycles = 0
+soak_ok = True
+last_reload = episode_start
+frames = 0
+server_frames = 0
+last_server_frame = None
 
 try:
     while running:
         clock.tick(60)
-
-        for event in pygame.event.get():
+        now = time.time()
+        if scenario['episode_length'] and now - episode_start >= scenario['episode_length']:
+            print(f"[Scenario] Episode length of {scenario['episode_length']} s reached")
+            running = False
+        weather_engine.update(now)
+        resource_tracker.maybe_sample(now)
+        if args.soak and now - last_reload >= args.soak_dwell:
+            # Sample at steady state, just before the next reload
+            resource_tracker.sample('reload', now)
+            soak_cycles += 1
+            if soak_cycles > args.soak:
+                running = False
+            else:
+                # Same town every cycle: props and traffic lights differ between maps
+                print(f"[Soak] Reload cycle {soak_cycles}/{args.soak}")
+                change_town(step=0)
+            last_reload = time.time()
+
+        events = pygame.event.get()
+        for ego in egos:
+            if ego.input_poller:
+                ego.input_poller.mark_pump()
+        for event in events:
             if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and (event.key == pygame.K_ESCAPE or event.key == pygame.K_q)):
                 running = False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_w:
-                    weather_index = (weather_index + 1) % len(weather_presets)
-                    world.set_weather(weather_presets[weather_index])
-                    print(f"[Weather] Changed to preset index: {weather_index}")
+                    weather_index = weather_engine.next_preset(now)
+                    print(f"[Weather] Blending to preset index: {weather_index}")
                 elif event.key == pygame.K_t:
-                    town_index = (town_index + 1) % len(available_towns)
-                    print(f"[Town] Changing to {available_towns[town_index]}")
-                    reload_world(available_towns[town_index])
-                    spawn_av_and_pedestrians()
+                    change_town()
             elif event.type == pygame.JOYBUTTONDOWN and event.button == 1:
-                reverse_mode = not reverse_mode
+                ego = ego_for_joystick(event.instance_id)
+                if ego:
+                    ego.toggle_reverse()
             elif event.type == pygame.JOYBUTTONDOWN and event.button == 2:
                 print("[HORN] Honk!")
-                horn_sound.play()
-
-        steer = apply_deadzone(joystick.get_axis(0))
-        throttle = apply_deadzone((-joystick.get_axis(1) + 1) / 2.0)
-        brake = apply_deadzone((-joystick.get_axis(2) + 1) / 2.0)
-        handbrake = joystick.get_button(0)
-
-        control = carla.VehicleControl(
-            steer=steer,
-            throttle=throttle,
-            brake=brake,
-            hand_brake=handbrake,
-            reverse=reverse_mode
-        )
-        vehicle.apply_control(control)
-
-        velocity = vehicle.get_velocity()
-        speed_kmh = 3.6 * (velocity.x**2 + velocity.y**2 + velocity.z**2)**0.5
-        log_writer.writerow([driver_name, datetime.datetime.now().strftime("%H:%M:%S.%f"), f"{speed_kmh:.2f}", f"{throttle:.2f}", f"{brake:.2f}"])
+                if horn_sound:
+                    horn_sound.play()
+
+        traffic = av_vehicles + walkers
+        for ego in egos:
+            ego.tick(traffic + [other.vehicle for other in egos if other is not ego and other.vehicle])
+
+        snapshot_frame = world.get_snapshot().frame
+        if last_server_frame is not None:
+            server_frames += max(0, snapshot_frame - last_server_frame)
+        last_server_frame = snapshot_frame
+        frames += 1
 
         screen.fill((0, 0, 0))
-        if camera_surfaces[0]:
-            screen.blit(camera_surfaces[0], (0, 0))
-            screen.blit(font.render("Front Camera", True, (255, 255, 0)), (300, 10))
-            screen.blit(font.render(f"Speed: {speed_kmh:.1f} km/h", True, (255, 255, 255)), (10, 40))
-            screen.blit(font.render(f"Hi,Virtual Driver: {driver_name}", True, (0, 255, 0)), (10, 80))
-
-        if camera_surfaces[1]:
-            screen.blit(camera_surfaces[1], (800, 0))
-            screen.blit(font.render("Rear Camera", True, (255, 255, 0)), (1000, 10))
-        if camera_surfaces[2]:
-            screen.blit(camera_surfaces[2], (800, 300))
-            screen.blit(font.render("Left Camera", True, (255, 255, 0)), (1000, 310))
-        if camera_surfaces[3]:
-            screen.blit(camera_surfaces[3], (800, 600))
-            screen.blit(font.render("Right Camera", True, (255, 255, 0)), (1000, 610))
-        if camera_surfaces[4]:
-            screen.blit(camera_surfaces[4], (0, 600))
-            screen.blit(font.render("BEV Camera", True, (255, 255, 0)), (300, 610))
-
-        overlay = font.render(f"Gear: {'REVERSE' if reverse_mode else 'DRIVE'}", True, (255, 255, 255))
-        screen.blit(overlay, (10, 10))
+        if len(egos) == 1:
+            draw_rig(egos[0])
+        else:
+            draw_split(egos)
         pygame.display.flip()
 
 except KeyboardInterrupt:
@@ -266,24 +372,25 @@ except KeyboardInterrupt:
 
 finally:
     print("[Shutdown] Cleaning up resources...")
-    for cam in cameras:
-        cam.stop()
-        cam.destroy()
-    for rec in recordings:
-        if rec:
-            rec.release()
-    if collision_sensor:
-        collision_sensor.stop()
-        collision_sensor.destroy()
-    log_file.close()
-    collision_file.close()
-    if vehicle:
-        vehicle.destroy()
-    for av in av_vehicles:
-        av.destroy()
-    for c in walker_controllers:
-        c.stop()
-        c.destroy()
-    for w in walkers:
-        w.destroy()
+    for ego in egos:
+        if ego.input_poller:
+            ego.input_poller.stop()
+    session_recorder.stop_segment()
+    actor_cleanup.destroy_all()
+    for ego in egos:
+        ego.close()
+    elapsed = time.time() - episode_start
+    if frames and elapsed > 0:
+        # Run with 1, 2, 3... egos to read off the cost of each extra participant
+        per_ego = sum(ego.mean_tick_ms() for ego in egos)
+        print(f"[Egos] {len(egos)} egos: client {frames / elapsed:.1f} FPS, server {server_frames / elapsed:.1f} FPS, "
+              f"{per_ego:.2f} ms/frame in ego ticks ({per_ego / len(egos):.2f} ms per ego)")
+    if weather_engine:
+        print(f"[Weather] {weather_engine.stats()}")
+    if args.soak:
+        soak_ok = resource_tracker.check_growth('reload')
+    resource_tracker.close()
     pygame.quit()
+
+if not soak_ok:
+    sys.exit(1)
@@ -0,0 +1,78 @@
+# Tracks every actor a session spawns and tears them all down in one batch:
+# sensors are stopped first, then everything is destroyed with a single
+# apply_batch_sync, then the server is checked for anything left behind.
+# A failure on one actor (e.g. already gone after reload_world) no longer
+# aborts the rest, and the same cleanup runs on SIGTERM / interpreter exit.
+
+import atexit
+import signal
+import sys
+import time
+
+import carla
+
+
+class ActorCleanup:
+    def __init__(self, client):
+        self.client = client
+        self.actors = {}  # id -> actor, in spawn order
+
+    def track(self, actor):
+        if actor is not None:
+            self.actors[actor.id] = actor
+        return actor
+
+    def untrack(self, actor):
+        if actor is not None:
+            self.actors.pop(actor.id, None)
+
+    def install_handlers(self):
+        atexit.register(self.destroy_all)
+
+        def on_signal(signum, frame):
+            # Unwind through the caller's finally block; atexit is the backstop
+            sys.exit(128 + signum)
+
+        signal.signal(signal.SIGTERM, on_signal)
+
+    def destroy_all(self, label="Shutdown"):
+        if not self.actors:
+            return 0, 0
+        start = time.perf_counter()
+        actors = list(self.actors.values())
+        self.actors = {}
+
+        for actor in actors:
+            try:
+                if actor.type_id.startswith(('sensor.', 'controller.')):
+                    actor.stop()
+            except RuntimeError:
+                pass  # already destroyed server-side
+
+        # Children (sensors, controllers) go before the actors they are attached to
+        ordered = sorted(actors, key=lambda a: 0 if a.type_id.startswith(('sensor.', 'controller.')) else 1)
+        ids = [a.id for a in ordered]
+        try:
+            self.client.apply_batch_sync([carla.command.DestroyActor(actor_id) for actor_id in ids])
+        except RuntimeError as e:
+            print(f"[{label}] Batch destroy failed: {e}")
+
+        leaked = self.remaining(ids)
+        for actor in leaked:
+            try:
+                actor.destroy()
+            except RuntimeError:
+                pass
+        leaked = self.remaining(ids)
+
+        elapsed = (time.perf_counter() - start) * 1000.0
+        print(f"[{label}] Destroyed {len(ids) - len(leaked)}/{len(ids)} actors in {elapsed:.1f} ms, {len(leaked)} leaked")
+        for actor in leaked:
+            print(f"[{label}] Leaked actor {actor.id} ({actor.type_id})")
+        return len(ids) - len(leaked), len(leaked)
+
+    def remaining(self, ids):
+        try:
+            return list(self.client.get_world().get_actors(ids))
+        except RuntimeError:
+            return []
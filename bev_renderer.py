@@ -0,0 +1,251 @@
+# Client-side Bird's Eye View renderer: draws lanes from a cached map waypoint
+# raster plus actor boxes into a NumPy canvas, heading-up around the ego.
+# Replaces the 50 m overhead RGB camera, which makes the server render and
+# stream a full 3D scene just to show a top-down map.
+#
+#   python bev_renderer.py            -> offline render cost
+#   python bev_renderer.py --carla    -> server FPS / bandwidth, camera vs renderer
+
+import argparse
+import time
+
+import numpy as np
+
+ROAD_COLOR = (70, 70, 70)
+LANE_EDGE_COLOR = (200, 200, 200)
+VEHICLE_COLOR = (0, 120, 255)
+WALKER_COLOR = (255, 200, 0)
+EGO_COLOR = (0, 255, 0)
+TILE_SIZE = 25.0  # meters, bucket size of the cached lane raster
+
+_raster_cache = {}  # (map name, spacing) -> (road tiles, edge tiles), shared by every ego
+
+
+def build_lane_raster(world_map, spacing=2.0, lateral_samples=5):
+    # Sample every lane across its width once per town; returns (road, edges)
+    # as (N, 2) world-frame xy point arrays.
+    waypoints = world_map.generate_waypoints(spacing)
+    centers = np.array([[wp.transform.location.x, wp.transform.location.y] for wp in waypoints])
+    yaws = np.radians([wp.transform.rotation.yaw for wp in waypoints])
+    widths = np.array([wp.lane_width for wp in waypoints])
+    right = np.stack([-np.sin(yaws), np.cos(yaws)], axis=1)
+    offsets = np.linspace(-0.5, 0.5, lateral_samples)
+    points = centers[:, None, :] + right[:, None, :] * (widths[:, None, None] * offsets[None, :, None])
+    return points.reshape(-1, 2), points[:, [0, -1], :].reshape(-1, 2)
+
+
+def bucket_points(points, tile_size=TILE_SIZE):
+    # Group points by square tile so each frame only touches tiles in view
+    keys = np.floor(points / tile_size).astype(np.int64)
+    order = np.lexsort((keys[:, 1], keys[:, 0]))
+    keys, points = keys[order], points[order]
+    split = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+    return {tuple(int(k) for k in chunk_keys[0]): chunk for chunk_keys, chunk in zip(np.split(keys, split), np.split(points, split))}
+
+
+class BEVRenderer:
+    def __init__(self, world_map, width=400, height=300, range_m=50.0, spacing=2.0):
+        self.width = width
+        self.height = height
+        self.range_m = range_m
+        self.pixels_per_meter = min(width, height) / (2.0 * range_m)
+        self.spacing = spacing
+        key = (world_map.name, spacing)
+        if key not in _raster_cache:
+            road_points, edge_points = build_lane_raster(world_map, spacing)
+            _raster_cache.clear()  # one town at a time
+            _raster_cache[key] = (bucket_points(road_points), bucket_points(edge_points))
+        self.road_tiles, self.edge_tiles = _raster_cache[key]
+        self.render_time = 0.0
+        self.frames = 0
+
+    def _to_pixels(self, points, ego_xy, yaw):
+        # World xy -> canvas (row, col), ego at center, heading up
+        d = points - ego_xy
+        cos, sin = np.cos(yaw), np.sin(yaw)
+        forward = d[:, 0] * cos + d[:, 1] * sin
+        right = -d[:, 0] * sin + d[:, 1] * cos
+        rows = np.round(self.height / 2.0 - forward * self.pixels_per_meter).astype(np.int32)
+        cols = np.round(self.width / 2.0 + right * self.pixels_per_meter).astype(np.int32)
+        inside = (rows >= 0) & (rows < self.height) & (cols >= 0) & (cols < self.width)
+        return rows[inside], cols[inside]
+
+    def _points_in_view(self, tiles, ego_xy):
+        reach = int(np.ceil(self.range_m * 1.5 / TILE_SIZE))
+        tx, ty = np.floor(ego_xy / TILE_SIZE).astype(np.int64)
+        chunks = [tiles[key] for key in ((x, y) for x in range(tx - reach, tx + reach + 1)
+                                         for y in range(ty - reach, ty + reach + 1)) if key in tiles]
+        return np.concatenate(chunks) if chunks else np.empty((0, 2))
+
+    def _splat(self, canvas, rows, cols, color, size=1):
+        # Stamp a size x size block per point so sparse samples leave no gaps
+        for dr in range(size):
+            for dc in range(size):
+                r = np.clip(rows + dr - size // 2, 0, self.height - 1)
+                c = np.clip(cols + dc - size // 2, 0, self.width - 1)
+                canvas[r, c] = color
+
+    def _box_points(self, centers, yaws, extents):
+        # Dense samples inside each oriented bounding box, (N * S * S, 2)
+        steps = int(np.ceil(2.0 * extents.max() * self.pixels_per_meter)) + 1
+        u = np.linspace(-1.0, 1.0, steps)
+        uu, vv = np.meshgrid(u, u)
+        cos, sin = np.cos(yaws)[:, None, None], np.sin(yaws)[:, None, None]
+        ex, ey = extents[:, 0, None, None] * uu, extents[:, 1, None, None] * vv
+        x = centers[:, 0, None, None] + ex * cos - ey * sin
+        y = centers[:, 1, None, None] + ex * sin + ey * cos
+        return np.stack([x.ravel(), y.ravel()], axis=1)
+
+    def render(self, ego, actors):
+        start = time.perf_counter()
+        canvas = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        ego_tf = ego.get_transform()
+        ego_xy = np.array([ego_tf.location.x, ego_tf.location.y])
+        yaw = np.radians(ego_tf.rotation.yaw)
+
+        # Only tiles around the ego are transformed; the rest of the town is skipped
+        reach = self.range_m * 1.5
+        for tiles, color in ((self.road_tiles, ROAD_COLOR), (self.edge_tiles, LANE_EDGE_COLOR)):
+            rows, cols = self._to_pixels(self._points_in_view(tiles, ego_xy), ego_xy, yaw)
+            size = max(1, int(np.ceil(self.spacing * self.pixels_per_meter / 2.0))) if color is ROAD_COLOR else 1
+            self._splat(canvas, rows, cols, color, size)
+
+        groups = {VEHICLE_COLOR: [], WALKER_COLOR: []}
+        for actor in actors:
+            if actor is None:
+                continue
+            groups[WALKER_COLOR if actor.type_id.startswith('walker') else VEHICLE_COLOR].append(actor)
+        groups[EGO_COLOR] = [ego]
+
+        for color, group in groups.items():
+            if not group:
+                continue
+            transforms = [a.get_transform() for a in group]
+            centers = np.array([[t.location.x, t.location.y] for t in transforms])
+            yaws = np.radians([t.rotation.yaw for t in transforms])
+            extents = np.array([[a.bounding_box.extent.x, a.bounding_box.extent.y] for a in group])
+            in_view = np.abs(centers - ego_xy).max(axis=1) < reach
+            if not in_view.any():
+                continue
+            points = self._box_points(centers[in_view], yaws[in_view], extents[in_view])
+            rows, cols = self._to_pixels(points, ego_xy, yaw)
+            canvas[rows, cols] = color
+
+        self.render_time += time.perf_counter() - start
+        self.frames += 1
+        return canvas
+
+    def mean_cost_ms(self):
+        return 1000.0 * self.render_time / self.frames if self.frames else 0.0
+
+
+def benchmark_offline(frames=200, range_m=50.0):
+    # Synthetic map and actors so the render cost can be measured without a server
+    class _Loc:
+        def __init__(self, x, y):
+            self.x, self.y, self.z = x, y, 0.0
+
+    class _Rot:
+        def __init__(self, yaw):
+            self.yaw = yaw
+
+    class _Tf:
+        def __init__(self, x, y, yaw):
+            self.location, self.rotation = _Loc(x, y), _Rot(yaw)
+
+    class _Waypoint:
+        lane_width = 3.5
+
+        def __init__(self, x, y, yaw):
+            self.transform = _Tf(x, y, yaw)
+
+    class _Map:
+        name = 'Synthetic'
+
+        def generate_waypoints(self, spacing):
+            grid = np.arange(-400.0, 400.0, spacing)
+            return ([_Waypoint(x, y, 0.0) for y in np.arange(-400.0, 400.0, 40.0) for x in grid] +
+                    [_Waypoint(x, y, 90.0) for x in np.arange(-400.0, 400.0, 40.0) for y in grid])
+
+    class _Actor:
+        class bounding_box:
+            class extent:
+                x, y = 2.3, 1.0
+
+        def __init__(self, type_id, x, y, yaw):
+            self.type_id = type_id
+            self._tf = _Tf(x, y, yaw)
+
+        def get_transform(self):
+            return self._tf
+
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    renderer = BEVRenderer(_Map(), range_m=range_m)
+    points = sum(len(tile) for tile in renderer.road_tiles.values())
+    print(f"[Benchmark] Lane raster: {points} points in {time.perf_counter() - start:.2f} s")
+    ego = _Actor('vehicle.tesla.model3', 0.0, 0.0, 30.0)
+    actors = [_Actor('vehicle.audi.tt', *rng.uniform(-60, 60, 2), rng.uniform(0, 360)) for _ in range(30)]
+    actors += [_Actor('walker.pedestrian.0001', *rng.uniform(-60, 60, 2), rng.uniform(0, 360)) for _ in range(10)]
+    for _ in range(frames):
+        renderer.render(ego, actors)
+    print(f"[Benchmark] BEV render {renderer.width}x{renderer.height}: {renderer.mean_cost_ms():.2f} ms/frame")
+
+
+def benchmark_server(seconds=10.0, host='localhost', port=2000, range_m=50.0):
+    import carla
+
+    client = carla.Client(host, port)
+    client.set_timeout(10.0)
+    world = client.get_world()
+    blueprints = world.get_blueprint_library()
+    ego = world.try_spawn_actor(blueprints.find('vehicle.tesla.model3'), world.get_map().get_spawn_points()[0])
+    ego.set_autopilot(True)
+
+    try:
+        for mode in ('camera', 'renderer'):
+            received = [0]
+            camera = None
+            renderer = None
+            if mode == 'camera':
+                bp = blueprints.find('sensor.camera.rgb')
+                bp.set_attribute('image_size_x', '400')
+                bp.set_attribute('image_size_y', '300')
+                bp.set_attribute('fov', '90')
+                camera = world.spawn_actor(bp, carla.Transform(carla.Location(z=50), carla.Rotation(pitch=-90)), attach_to=ego)
+                camera.listen(lambda image: received.__setitem__(0, received[0] + len(image.raw_data)))
+            else:
+                renderer = BEVRenderer(world.get_map(), range_m=range_m)
+
+            world.wait_for_tick()
+            first = world.get_snapshot().frame
+            start = time.perf_counter()
+            while time.perf_counter() - start < seconds:
+                world.wait_for_tick()
+                if renderer:
+                    renderer.render(ego, world.get_actors().filter('vehicle.*'))
+            elapsed = time.perf_counter() - start
+            frames = world.get_snapshot().frame - first
+
+            if camera:
+                camera.stop()
+                camera.destroy()
+            extra = f", render {renderer.mean_cost_ms():.2f} ms/frame" if renderer else ""
+            print(f"[Benchmark] {mode:8s}: server {frames / elapsed:.1f} FPS, "
+                  f"sensor stream {received[0] / elapsed / 1e6:.2f} MB/s{extra}")
+    finally:
+        ego.destroy()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="BEV renderer benchmark")
+    parser.add_argument('--carla', action='store_true', help="compare against the overhead camera on a running server")
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--range', type=float, default=50.0, help="meters from the ego to the edge of the view")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=2000)
+    args = parser.parse_args()
+    if args.carla:
+        benchmark_server(args.seconds, args.host, args.port, args.range)
+    else:
+        benchmark_offline(range_m=args.range)
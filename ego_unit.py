@@ -0,0 +1,190 @@
+# One participant in a driving session: the ego vehicle, its sensor rig,
+# collision / drive / near-miss logs and its control source (a joystick read
+# by its own InputPoller, or the Traffic Manager autopilot as a scripted
+# agent). Final_Advance_File creates one EgoUnit per entry in scenario['egos'],
+# all sharing the same world and traffic.
+
+import csv
+import datetime
+import os
+import time
+
+import carla
+import numpy as np
+import pygame
+
+from bev_renderer import BEVRenderer
+from input_poller import AxisMapping, InputPoller
+from proximity_monitor import ProximityMonitor
+
+
+class EgoUnit:
+    def __init__(self, name, driver_name, log_dir, scenario, actor_cleanup, role_name, control='joystick', joystick=None):
+        self.name = name
+        self.driver_name = driver_name
+        self.log_dir = log_dir
+        self.scenario = scenario
+        self.actor_cleanup = actor_cleanup
+        self.role_name = role_name
+        self.control_source = control
+        self.joystick = joystick
+
+        self.vehicle = None
+        self.collision_sensor = None
+        self.cameras = []
+        self.camera_surfaces = [None] * 5
+        self.recordings = [None] * 5
+        self.bev_renderer = None
+        self.reverse_mode = False
+        self.control = carla.VehicleControl()
+        self.speed_kmh = 0.0
+        self.segment = -1  # town segment, so each reload records to new video files
+        self.tick_time = 0.0
+        self.ticks = 0
+
+        os.makedirs(log_dir, exist_ok=True)
+        self.log_file = open(os.path.join(log_dir, "drive_log.csv"), mode='w', newline='')
+        self.log_writer = csv.writer(self.log_file)
+        self.log_writer.writerow(["Driver", "Timestamp", "Speed_kmh", "Throttle", "Brake", "Steer", "Reverse"])
+
+        self.collision_file = open(os.path.join(log_dir, "collision_log.csv"), mode='w', newline='')
+        self.collision_writer = csv.writer(self.collision_file)
+        self.collision_writer.writerow(["Driver", "Timestamp", "Other Actor", "Location X", "Location Y", "Location Z"])
+
+        self.proximity_monitor = ProximityMonitor(os.path.join(log_dir, "near_miss_log.csv"), driver_name)
+
+        self.input_poller = None
+        if control == 'joystick':
+            input_config = scenario['input']
+            self.input_poller = InputPoller(
+                joystick,
+                {axis_name: AxisMapping(**axis) for axis_name, axis in input_config['axes'].items()},
+                input_config['handbrake_button'],
+                input_config['rate_hz'],
+                input_config['latency_budget_ms'],
+                input_config['backend']
+            )
+
+    def spawn(self, world, world_map, blueprints, spawn_point):
+        self.despawn()
+        self.segment += 1
+        vehicle_bp = blueprints.find(self.scenario['ego_blueprint'])
+        vehicle_bp.set_attribute('role_name', self.role_name)
+        self.vehicle = self.actor_cleanup.track(world.try_spawn_actor(vehicle_bp, spawn_point))
+        if not self.vehicle:
+            print(f"[{self.name}] Could not spawn ego vehicle.")
+            return False
+
+        self.vehicle.set_autopilot(self.control_source == 'autopilot')
+        col_sensor_bp = blueprints.find('sensor.other.collision')
+        self.collision_sensor = self.actor_cleanup.track(world.spawn_actor(col_sensor_bp, carla.Transform(), attach_to=self.vehicle))
+        self.collision_sensor.listen(self.on_collision)
+
+        for index, cam in enumerate(self.scenario['sensors']):
+            if index == 4 and self.scenario['bev_renderer']:
+                self.bev_renderer = BEVRenderer(world_map, cam['width'], cam['height'], self.scenario['bev_range'])
+                self.recordings[4] = self.make_recording(4, cam['width'], cam['height'])
+                continue
+            transform = carla.Transform(carla.Location(x=cam['x'], y=cam['y'], z=cam['z']),
+                                        carla.Rotation(pitch=cam['pitch'], yaw=cam['yaw'], roll=cam['roll']))
+            self.make_camera(world, blueprints, transform, index, cam['width'], cam['height'], cam['fov'])
+
+        if self.input_poller:
+            self.input_poller.vehicle = self.vehicle
+        return True
+
+    def despawn(self):
+        # Actors themselves are destroyed in one batch by ActorCleanup
+        if self.input_poller:
+            self.input_poller.vehicle = None
+        for rec in self.recordings:
+            if rec:
+                rec.release()
+        self.vehicle = None
+        self.collision_sensor = None
+        self.cameras = []
+        self.camera_surfaces = [None] * 5
+        self.recordings = [None] * 5
+        self.bev_renderer = None
+
+    def make_recording(self, index, width, height):
+        if not self.scenario['record_video']:
+            return None
+        import cv2  # only needed when recording, and slow to import
+        suffix = f"_{self.segment:02d}" if self.segment > 0 else ""
+        filename = os.path.join(self.log_dir, f"camera_{index}{suffix}.avi")
+        fourcc = cv2.VideoWriter_fourcc(*'XVID')
+        return cv2.VideoWriter(filename, fourcc, 20.0, (width, height))
+
+    def make_camera(self, world, blueprints, transform, index, width, height, fov=90):
+        bp = blueprints.find('sensor.camera.rgb')
+        bp.set_attribute('image_size_x', str(width))
+        bp.set_attribute('image_size_y', str(height))
+        bp.set_attribute('fov', str(fov))
+        cam = self.actor_cleanup.track(world.spawn_actor(bp, transform, attach_to=self.vehicle))
+
+        out = self.make_recording(index, width, height)
+        self.recordings[index] = out
+        surfaces = self.camera_surfaces
+
+        def callback(image):
+            image.convert(carla.ColorConverter.Raw)
+            array = np.frombuffer(image.raw_data, dtype=np.uint8).reshape((image.height, image.width, 4))
+            rgb_array = array[:, :, :3][:, :, ::-1]
+            surfaces[index] = pygame.surfarray.make_surface(rgb_array.swapaxes(0, 1))
+            if out:
+                out.write(rgb_array)
+
+        cam.listen(callback)
+        self.cameras.append(cam)
+
+    def on_collision(self, event):
+        if not self.vehicle:
+            return  # late event from a sensor destroyed by a town reload
+        other_actor = event.other_actor
+        location = self.vehicle.get_location()
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S.%f")
+        self.collision_writer.writerow([self.driver_name, timestamp, other_actor.type_id, location.x, location.y, location.z])
+        print(f"[COLLISION] {self.name} with {other_actor.type_id} at ({location.x:.2f}, {location.y:.2f}, {location.z:.2f})")
+
+    def start(self):
+        if self.input_poller:
+            self.input_poller.start()
+
+    def toggle_reverse(self):
+        self.reverse_mode = not self.reverse_mode
+        if self.input_poller:
+            self.input_poller.reverse = self.reverse_mode
+
+    def tick(self, others):
+        if not self.vehicle:
+            return
+        start = time.perf_counter()
+        # Joystick controls are applied by the input poller thread; this is the last one sent
+        self.control = self.input_poller.control if self.input_poller else self.vehicle.get_control()
+        velocity = self.vehicle.get_velocity()
+        self.speed_kmh = 3.6 * (velocity.x**2 + velocity.y**2 + velocity.z**2)**0.5
+        self.log_writer.writerow([self.driver_name, datetime.datetime.now().strftime("%H:%M:%S.%f"), f"{self.speed_kmh:.2f}",
+                                  f"{self.control.throttle:.2f}", f"{self.control.brake:.2f}", f"{self.control.steer:.2f}", int(self.control.reverse)])
+        self.proximity_monitor.update(self.vehicle, others)
+
+        if self.bev_renderer:
+            bev_array = self.bev_renderer.render(self.vehicle, others)
+            self.camera_surfaces[4] = pygame.surfarray.make_surface(bev_array.swapaxes(0, 1))
+            if self.recordings[4]:
+                self.recordings[4].write(bev_array)
+        self.tick_time += time.perf_counter() - start
+        self.ticks += 1
+
+    def mean_tick_ms(self):
+        return 1000.0 * self.tick_time / self.ticks if self.ticks else 0.0
+
+    def close(self):
+        if self.input_poller:
+            self.input_poller.stop()
+            print(self.input_poller.report())
+        self.despawn()
+        self.log_file.close()
+        self.collision_file.close()
+        self.proximity_monitor.close()
+        print(f"[{self.name}] {self.driver_name}: {self.mean_tick_ms():.2f} ms client time per tick")
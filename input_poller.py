@@ -0,0 +1,243 @@
+# Fixed-rate wheel/pedal sampling on its own thread. Axes are mapped through
+# per-axis deadzone/curve settings and apply_control is submitted from the
+# thread, so sending controls no longer waits on the previous frame's blits
+# and display.flip().
+#
+# Where the wheel is read from decides what the latency report covers:
+#   - evdev (Linux, optional `evdev` package): the poller thread reads
+#     /dev/input itself, so input is picked up within one poll period no matter
+#     what the main loop is doing. Latency runs from the kernel's timestamp of
+#     the first input event to apply_control returning: true end-to-end,
+#     minus USB and server-side time.
+#   - pygame (everything else): SDL only refreshes the axis state when the main
+#     thread pumps events (pygame.event.get()), so input still waits up to one
+#     render frame. The main loop calls mark_pump(); latency runs from the pump
+#     before the one that exposed the new value (the earliest the OS could have
+#     delivered it) to apply_control returning, an upper bound that includes
+#     that frame wait.
+
+import collections
+import math
+import sys
+import threading
+import time
+
+import carla
+import numpy as np
+import pygame
+
+try:
+    import evdev
+except ImportError:
+    evdev = None
+
+HAT_CODES = range(0x10, 0x18)  # ABS_HAT0X..ABS_HAT3Y, which SDL reports as hats, not axes
+
+
+class AxisMapping:
+    def __init__(self, axis, deadzone=0.1, exponent=1.0, pedal=False):
+        self.axis = axis
+        self.deadzone = deadzone
+        self.exponent = exponent
+        self.pedal = pedal  # pedals rest at +1 and read -1 fully pressed
+
+    def __call__(self, raw):
+        value = (1.0 - raw) / 2.0 if self.pedal else raw
+        magnitude = abs(value)
+        if magnitude < self.deadzone:
+            return 0.0
+        # Rescale past the deadzone so output starts at 0 instead of stepping to it
+        scaled = min((magnitude - self.deadzone) / (1.0 - self.deadzone), 1.0) ** self.exponent
+        return math.copysign(scaled, value)
+
+
+DEFAULT_MAPPINGS = {
+    'steer': AxisMapping(0, deadzone=0.1),
+    'throttle': AxisMapping(1, deadzone=0.1, pedal=True),
+    'brake': AxisMapping(2, deadzone=0.1, pedal=True),
+}
+
+
+class EvdevJoystick:
+    # The wheel read straight from its /dev/input/event* node. Axes and buttons
+    # are numbered and scaled like SDL's, so scenario axis indices mean the same
+    # as with pygame. Only touched from the poller thread.
+    def __init__(self, device):
+        self.device = device
+        caps = device.capabilities()
+        abs_info = dict(caps.get(evdev.ecodes.EV_ABS, []))
+        keys = caps.get(evdev.ecodes.EV_KEY, [])
+        self.abs_info = {code: info for code, info in abs_info.items() if code not in HAT_CODES}
+        self.axis_index = {code: i for i, code in enumerate(sorted(self.abs_info))}
+        self.axes = [self._scale(code, self.abs_info[code].value) for code in sorted(self.abs_info)]
+        # SDL numbers BTN_JOYSTICK and up first, then BTN_MISC..BTN_JOYSTICK-1
+        buttons = (sorted(c for c in keys if c >= evdev.ecodes.BTN_JOYSTICK)
+                   + sorted(c for c in keys if evdev.ecodes.BTN_MISC <= c < evdev.ecodes.BTN_JOYSTICK))
+        self.button_index = {code: i for i, code in enumerate(buttons)}
+        pressed = set(device.active_keys())
+        self.buttons = [int(code in pressed) for code in buttons]
+
+    @classmethod
+    def open(cls, joystick):
+        # Match by name; the nth pygame joystick with a name is the nth device node with it
+        if evdev is None or not sys.platform.startswith('linux'):
+            return None
+        name = joystick.get_name()
+        nth = sum(1 for i in range(joystick.get_id()) if pygame.joystick.Joystick(i).get_name() == name)
+        seen = 0
+        for path in sorted(evdev.list_devices(), key=lambda p: int(p.rsplit('event', 1)[-1])):
+            try:
+                device = evdev.InputDevice(path)
+            except OSError:
+                continue  # no read permission (user not in the 'input' group)
+            if device.name == name:
+                if seen == nth:
+                    return cls(device)
+                seen += 1
+            device.close()
+        return None
+
+    def _scale(self, code, value):
+        info = self.abs_info[code]
+        if info.max == info.min:
+            return 0.0
+        return (value - info.min) * 2.0 / (info.max - info.min) - 1.0
+
+    def get_name(self):
+        return self.device.name
+
+    def get_axis(self, index):
+        return self.axes[index]
+
+    def get_button(self, index):
+        return self.buttons[index]
+
+    def drain(self):
+        # Apply every pending event; returns the kernel timestamp of the first, or None
+        first = None
+        try:
+            for event in self.device.read():
+                if event.type == evdev.ecodes.EV_ABS and event.code in self.axis_index:
+                    self.axes[self.axis_index[event.code]] = self._scale(event.code, event.value)
+                elif event.type == evdev.ecodes.EV_KEY and event.code in self.button_index:
+                    self.buttons[self.button_index[event.code]] = int(event.value != 0)
+                else:
+                    continue
+                if first is None:
+                    first = event.timestamp()
+        except BlockingIOError:
+            pass  # nothing (more) queued
+        return first
+
+    def close(self):
+        self.device.close()
+
+
+class InputPoller:
+    def __init__(self, joystick, mappings=None, handbrake_button=0, rate_hz=250.0, latency_budget_ms=20.0, backend='auto'):
+        self.joystick = joystick
+        self.device = EvdevJoystick.open(joystick) if backend == 'auto' else None
+        self.backend = 'evdev' if self.device else 'pygame'
+        self.mappings = mappings or DEFAULT_MAPPINGS
+        self.handbrake_button = handbrake_button
+        self.period = 1.0 / rate_hz
+        self.latency_budget_ms = latency_budget_ms
+        self.vehicle = None
+        self.reverse = False
+        self.control = carla.VehicleControl()
+        self.latencies = collections.deque(maxlen=100000)  # ms
+        self.overruns = 0
+        self._pumps = (None, None)  # (previous, last) main-loop event pump times
+        self._delivered_at = None   # kernel time of the first event not yet applied
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="input-poller", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        if self.device:
+            self.device.close()
+
+    def mark_pump(self):
+        # Call right after pygame.event.get(): that is when SDL refreshes the joystick state
+        self._pumps = (self._pumps[1], time.time())
+
+    def sample(self):
+        source = self.device or self.joystick
+        values = {name: mapping(source.get_axis(mapping.axis)) for name, mapping in self.mappings.items()}
+        return carla.VehicleControl(
+            steer=values.get('steer', 0.0),
+            throttle=values.get('throttle', 0.0),
+            brake=values.get('brake', 0.0),
+            hand_brake=bool(source.get_button(self.handbrake_button)),
+            reverse=self.reverse
+        )
+
+    def input_origin(self, sampled_at):
+        # Earliest time the input behind a control change can have reached the OS
+        if self.device:
+            return self._delivered_at or sampled_at
+        previous_pump = self._pumps[0]
+        return previous_pump if previous_pump is not None else sampled_at
+
+    def read_device(self):
+        try:
+            delivered_at = self.device.drain()
+        except OSError as e:
+            print(f"[Input] Lost {self.device.get_name()} ({e}), falling back to pygame")
+            self.device = None
+            self.backend = 'pygame'
+            return
+        if self._delivered_at is None:
+            self._delivered_at = delivered_at
+
+    def _run(self):
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            if self.device:
+                self.read_device()
+            sampled_at = time.time()
+            control = self.sample()
+            vehicle = self.vehicle
+            if vehicle is not None:
+                changed = control != self.control
+                try:
+                    vehicle.apply_control(control)
+                except RuntimeError:
+                    pass  # ego destroyed during a town reload
+                else:
+                    if changed:
+                        self.latencies.append((time.time() - self.input_origin(sampled_at)) * 1000.0)
+                self.control = control
+            self._delivered_at = None
+
+            next_tick += self.period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.overruns += 1
+                next_tick = time.perf_counter()
+
+    def report(self):
+        if not self.latencies:
+            return f"[Input] {self.backend}: no input changes recorded"
+        lat = np.array(self.latencies)
+        p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+        worst = lat.max()
+        if self.backend == 'evdev':
+            covers = "kernel input event to apply_control"
+        elif self._pumps[0] is not None:
+            covers = "upper bound, event pump before the change to apply_control"
+        else:
+            # No mark_pump() calls: only the poll-to-send part is measured
+            covers = "poll to apply_control only, worst incl. poll period"
+            worst += self.period * 1000.0
+        status = "within" if worst <= self.latency_budget_ms else "OVER"
+        return (f"[Input] {self.backend}: {len(lat)} changes, {covers}: p50 {p50:.2f} ms, p95 {p95:.2f} ms, "
+                f"p99 {p99:.2f} ms, worst {worst:.2f} ms ({status} {self.latency_budget_ms:.0f} ms budget), "
+                f"{self.overruns} overruns")
@@ -0,0 +1,219 @@
+# Near-miss monitor: clearance between bounding boxes and time-to-collision
+# (TTC) between the ego vehicle and every spawned AV / pedestrian, computed
+# each tick with NumPy. TTC only counts when the closest approach, projected
+# at constant velocity, passes within COLLISION_COURSE_MISS of the ego; an
+# oncoming car in the next lane is closing fast but is not a threat.
+# Run this file directly to benchmark the per-tick cost.
+
+import contextlib
+import csv
+import datetime
+import io
+import os
+import time
+
+import numpy as np
+
+NEAR_MISS_CLEARANCE = 1.2    # meters between bounding boxes
+NEAR_MISS_TTC = 1.5          # seconds
+COLLISION_COURSE_MISS = 0.5  # meters, projected clearance at closest approach
+
+
+def box_support(direction, cos, sin, extent):
+    # Half-width of each oriented box along its unit direction; direction: (N, 3),
+    # cos/sin of the box yaw: scalar or (N,), extent: (3,) or (N, 3) half-sizes
+    along = np.abs(direction[:, 0] * cos + direction[:, 1] * sin)
+    across = np.abs(direction[:, 1] * cos - direction[:, 0] * sin)
+    return along * extent[..., 0] + across * extent[..., 1] + np.abs(direction[:, 2]) * extent[..., 2]
+
+
+def box_clearance(rel_pos, ego_box, boxes):
+    # Gap between the boxes along the line joining their centres: a lower bound
+    # on the true distance, exact for boxes nose to tail or side by side
+    dist = np.sqrt(np.einsum('ij,ij->i', rel_pos, rel_pos))
+    direction = rel_pos / np.maximum(dist, 1e-6)[:, None]
+    return dist - box_support(direction, *ego_box) - box_support(direction, *boxes)
+
+
+def compute_proximity(ego_pos, ego_vel, ego_yaw, ego_extent, positions, velocities, yaws, extents):
+    # ego_pos/ego_vel/ego_extent: (3,), ego_yaw: degrees; positions/velocities/extents: (N, 3), yaws: (N,)
+    # Returns (clearance, ttc, miss) arrays of shape (N,): clearance now, the time until
+    # the boxes touch (inf unless closing onto a collision course) and the projected
+    # clearance at closest approach.
+    rel_pos = positions - ego_pos
+    rel_vel = velocities - ego_vel
+    ego_box = (np.cos(np.radians(ego_yaw)), np.sin(np.radians(ego_yaw)), np.asarray(ego_extent))
+    yaws = np.radians(yaws)
+    boxes = (np.cos(yaws), np.sin(yaws), extents)
+    clearance = box_clearance(rel_pos, ego_box, boxes)
+
+    # Closest approach at constant velocity: t* = -(r.v) / |v|^2
+    speed_sq = np.einsum('ij,ij->i', rel_vel, rel_vel)
+    closing = -np.einsum('ij,ij->i', rel_pos, rel_vel)
+    t_closest = np.zeros(clearance.shape)
+    np.divide(closing, speed_sq, out=t_closest, where=(closing > 1e-3) & (speed_sq > 1e-6))
+    miss = box_clearance(rel_pos + rel_vel * t_closest[:, None], ego_box, boxes)
+
+    # t* only decides whether this is a collision course; contact comes earlier, when the
+    # clearance is used up at the rate the centres close along the line between them
+    range_rate = closing / np.maximum(np.sqrt(np.einsum('ij,ij->i', rel_pos, rel_pos)), 1e-6)
+    on_course = (t_closest > 0) & (miss < COLLISION_COURSE_MISS)
+    ttc = np.full(clearance.shape, np.inf)
+    np.divide(np.maximum(clearance, 0.0), range_rate, out=ttc, where=on_course & (range_rate > 1e-3))
+    return clearance, ttc, miss
+
+
+class ProximityMonitor:
+    def __init__(self, log_path, driver_name, clearance_threshold=NEAR_MISS_CLEARANCE, ttc_threshold=NEAR_MISS_TTC):
+        self.driver_name = driver_name
+        self.clearance_threshold = clearance_threshold
+        self.ttc_threshold = ttc_threshold
+        self.log_file = open(log_path, mode='w', newline='')
+        self.log_writer = csv.writer(self.log_file)
+        self.log_writer.writerow(["Driver", "Timestamp", "Other Actor", "Clearance_m", "TTC_s", "Miss_m", "Location X", "Location Y", "Location Z"])
+        self.active = set()  # actor ids currently inside the near-miss envelope
+        self.extents = {}    # actor id -> bounding box half-sizes, fixed per actor
+        self.closest = None  # (type_id, distance, ttc) of the most urgent actor
+        self.min_distance = np.inf
+        self.min_ttc = np.inf
+        self.near_miss_count = 0
+        self.ticks = 0
+        self.total_time = 0.0
+
+    def update(self, ego, actors):
+        start = time.perf_counter()
+        actors = [a for a in actors if a is not None and a.id != ego.id]
+        if not actors:
+            self.closest = None
+            self.active.clear()
+            return
+
+        ego_transform = ego.get_transform()
+        loc = ego_transform.location
+        vel = ego.get_velocity()
+        ego_pos = np.array([loc.x, loc.y, loc.z])
+        ego_vel = np.array([vel.x, vel.y, vel.z])
+        ego_extent = self.extent(ego)
+        # Rebuilt each tick so actors destroyed by a town reload drop out
+        self.extents = {actor.id: self.extents.get(actor.id) or self.extent(actor) for actor in actors}
+        states = np.empty((len(actors), 7))
+        for i, actor in enumerate(actors):
+            a_transform = actor.get_transform()
+            a_loc = a_transform.location
+            a_vel = actor.get_velocity()
+            states[i] = (a_loc.x, a_loc.y, a_loc.z, a_vel.x, a_vel.y, a_vel.z, a_transform.rotation.yaw)
+        extents = np.array([self.extents[actor.id] for actor in actors])
+
+        dist, ttc, miss = compute_proximity(ego_pos, ego_vel, ego_transform.rotation.yaw, ego_extent,
+                                            states[:, :3], states[:, 3:6], states[:, 6], extents)
+
+        # Most urgent threat: lowest TTC if anything is closing, else nearest
+        idx = int(np.argmin(ttc)) if np.isfinite(ttc).any() else int(np.argmin(dist))
+        self.closest = (actors[idx].type_id, float(dist[idx]), float(ttc[idx]))
+        self.min_distance = min(self.min_distance, float(dist.min()))
+        self.min_ttc = min(self.min_ttc, float(ttc.min()))
+
+        near = np.flatnonzero((dist < self.clearance_threshold) | (ttc < self.ttc_threshold))
+        near_ids = set()
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S.%f")
+        for i in near:
+            actor = actors[i]
+            near_ids.add(actor.id)
+            if actor.id in self.active:
+                continue
+            # Log once per approach, not every tick the actor stays close
+            self.near_miss_count += 1
+            self.log_writer.writerow([self.driver_name, timestamp, actor.type_id, f"{dist[i]:.2f}", f"{ttc[i]:.2f}", f"{miss[i]:.2f}", loc.x, loc.y, loc.z])
+            print(f"[NEAR MISS] {actor.type_id} at {dist[i]:.2f} m, TTC {ttc[i]:.2f} s")
+        self.active = near_ids
+
+        self.ticks += 1
+        self.total_time += time.perf_counter() - start
+
+    def extent(self, actor):
+        extent = actor.bounding_box.extent
+        return (extent.x, extent.y, extent.z)
+
+    def hud_text(self):
+        if not self.closest:
+            return None
+        type_id, dist, ttc = self.closest
+        ttc_text = f"{ttc:.1f} s" if np.isfinite(ttc) else "--"
+        return f"Closest: {type_id.split('.')[-1]} {dist:.1f} m  TTC {ttc_text}"
+
+    def mean_cost_ms(self):
+        return 1000.0 * self.total_time / self.ticks if self.ticks else 0.0
+
+    def close(self):
+        print(f"[Proximity] {self.near_miss_count} near misses, min clearance {self.min_distance:.2f} m, "
+              f"min TTC {self.min_ttc:.2f} s, {self.mean_cost_ms():.3f} ms/tick")
+        self.log_file.close()
+
+
+class _Vector:
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+class _Rotation:
+    def __init__(self, yaw):
+        self.pitch, self.yaw, self.roll = 0.0, yaw, 0.0
+
+
+class _Transform:
+    def __init__(self, location, yaw):
+        self.location = location
+        self.rotation = _Rotation(yaw)
+
+
+class _BoundingBox:
+    def __init__(self, x, y, z):
+        self.extent = _Vector(x, y, z)
+
+
+class _Actor:
+    # Stands in for carla.Actor; the getters cost a Python call each, like the real client
+    def __init__(self, actor_id, position, velocity, yaw, extent=(2.3, 0.95, 0.75), type_id='vehicle.mock'):
+        self.id = actor_id
+        self.type_id = type_id
+        self.bounding_box = _BoundingBox(*extent)
+        self.transform = _Transform(_Vector(*position), yaw)
+        self.velocity = _Vector(*velocity)
+
+    def get_transform(self):
+        return self.transform
+
+    def get_velocity(self):
+        return self.velocity
+
+
+def benchmark(counts=(10, 40, 100, 1000, 10000), repeats=2000):
+    rng = np.random.default_rng(0)
+    for n in counts:
+        positions = rng.uniform(-200, 200, (n, 3))
+        velocities = rng.uniform(-15, 15, (n, 3))
+        yaws = rng.uniform(-180, 180, n)
+        extents = np.tile((2.3, 0.95, 0.75), (n, 1))
+        ego_pos = np.zeros(3)
+        ego_vel = np.array([10.0, 0.0, 0.0])
+        start = time.perf_counter()
+        for _ in range(repeats):
+            compute_proximity(ego_pos, ego_vel, 0.0, (2.3, 0.95, 0.75), positions, velocities, yaws, extents)
+        kernel = (time.perf_counter() - start) / repeats
+
+        # Full update(): per-actor getters, extent cache and logging, as in a real tick
+        ego = _Actor(-1, (0.0, 0.0, 0.0), (10.0, 0.0, 0.0), 0.0)
+        actors = [_Actor(i, positions[i], velocities[i], yaws[i]) for i in range(n)]
+        monitor = ProximityMonitor(os.devnull, 'benchmark')
+        update_repeats = max(1, repeats * 10 // n)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(update_repeats):
+                monitor.update(ego, actors)
+        update = (time.perf_counter() - start) / update_repeats
+        monitor.log_file.close()
+        print(f"[Benchmark] {n:6d} actors: kernel {kernel * 1e6:8.1f} us/tick, update() {update * 1e6:9.1f} us/tick")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,153 @@
+# Offline re-rendering of a recorded session: replays a CARLA recorder file
+# from recordings/<session>/ in synchronous mode and renders the camera rig
+# frame by frame, so the live drive does not have to encode five streams. The
+# rig is the session's own or any other (--rig, a scenario or a list of
+# cameras); --width / --height rescale every camera to fit that box while
+# keeping each camera's aspect ratio.
+#
+#   python replay_session.py recordings/20250101_120000 --segment 0 --width 1920 --height 1080
+#   python replay_session.py recordings/20250101_120000 --rig scenarios/wide_rig.json
+
+import argparse
+import os
+import queue
+import re
+import sys
+
+import carla
+import cv2
+import numpy as np
+
+from scenario_config import ScenarioError, load_rig
+from session_recorder import load_session_metadata
+
+
+def recorder_duration(client, recorder_file):
+    info = client.show_recorder_file_info(recorder_file, False)
+    match = re.search(r"Duration:\s*([\d.]+)", info)
+    return float(match.group(1)) if match else None
+
+
+def fit_size(width, height, max_width=None, max_height=None):
+    # Scale (width, height) to the given width and/or height without changing its
+    # aspect ratio; with both, fit inside the box. Even sizes keep the codec happy.
+    scales = [limit / size for limit, size in ((max_width, width), (max_height, height)) if limit]
+    if not scales:
+        return width, height
+    scale = min(scales)
+    return max(2, 2 * round(width * scale / 2)), max(2, 2 * round(height * scale / 2))
+
+
+def find_ego(world, role_name):
+    for actor in world.get_actors().filter('vehicle.*'):
+        if actor.attributes.get('role_name') == role_name:
+            return actor
+    return None
+
+
+def replay(session_path, segment=0, ego_index=0, width=None, height=None, fov=None, fps=20.0,
+           host='localhost', port=2000, rig_path=None):
+    metadata = load_session_metadata(session_path)
+    segments = metadata['segments']
+    if not segments:
+        print(f"[Replay] {session_path} has no CARLA recorder segments.")
+        return 1
+    if not 0 <= segment < len(segments):
+        print(f"[Replay] No segment {segment}: the session has segments 0-{len(segments) - 1}.")
+        return 1
+    egos = metadata.get('egos') or [{'role_name': metadata.get('ego_role_name', 'hero')}]
+    if not 0 <= ego_index < len(egos):
+        print(f"[Replay] No ego {ego_index}: the session has egos 0-{len(egos) - 1}.")
+        return 1
+    seg = segments[segment]
+    if rig_path:
+        try:
+            rig = load_rig(rig_path)
+        except ScenarioError as e:
+            print(f"[Replay] {e}")
+            return 1
+    else:
+        rig = metadata.get('sensors') or []
+
+    client = carla.Client(host, port)
+    client.set_timeout(30.0)
+    duration = recorder_duration(client, seg['recorder_file'])
+    if duration is None:
+        print(f"[Replay] Could not read {seg['recorder_file']} on the server.")
+        return 1
+
+    world = client.load_world(seg['town'])
+    original_settings = world.get_settings()
+    settings = world.get_settings()
+    settings.synchronous_mode = True
+    settings.fixed_delta_seconds = 1.0 / fps
+    world.apply_settings(settings)
+
+    out_dir = os.path.join(session_path, 'replay', f"segment_{segment:02d}_ego_{ego_index}")
+    os.makedirs(out_dir, exist_ok=True)
+    cameras, writers, frames = [], [], []
+    try:
+        client.replay_file(seg['recorder_file'], 0.0, 0.0, 0, False)
+        world.tick()
+        ego = find_ego(world, egos[ego_index]['role_name'])
+        if ego is None:
+            print("[Replay] Ego vehicle not found in the replay.")
+            return 1
+
+        blueprints = world.get_blueprint_library()
+        for index, cam in enumerate(rig):
+            w, h = fit_size(cam['width'], cam['height'], width, height)
+            bp = blueprints.find('sensor.camera.rgb')
+            bp.set_attribute('image_size_x', str(w))
+            bp.set_attribute('image_size_y', str(h))
+            bp.set_attribute('fov', str(fov or cam['fov']))
+            transform = carla.Transform(carla.Location(x=cam['x'], y=cam['y'], z=cam['z']),
+                                        carla.Rotation(pitch=cam['pitch'], yaw=cam['yaw'], roll=cam['roll']))
+            sensor = world.spawn_actor(bp, transform, attach_to=ego)
+            frame_queue = queue.Queue()
+            sensor.listen(frame_queue.put)
+            cameras.append(sensor)
+            frames.append(frame_queue)
+            writers.append(cv2.VideoWriter(os.path.join(out_dir, f"camera_{index}.avi"),
+                                           cv2.VideoWriter_fourcc(*'XVID'), fps, (w, h)))
+
+        total = int(duration * fps)
+        print(f"[Replay] {seg['town']}: {duration:.1f} s, {total} frames, {len(cameras)} cameras -> {out_dir}")
+        for step in range(total):
+            frame = world.tick()
+            for frame_queue, writer in zip(frames, writers):
+                # Drop anything older than this tick, then wait for this tick's image
+                while True:
+                    image = frame_queue.get(timeout=10.0)
+                    if image.frame >= frame:
+                        break
+                array = np.frombuffer(image.raw_data, dtype=np.uint8).reshape((image.height, image.width, 4))
+                writer.write(array[:, :, :3])
+            if step % int(fps * 10) == 0:
+                print(f"[Replay] {step}/{total} frames")
+    finally:
+        for sensor in cameras:
+            sensor.stop()
+            sensor.destroy()
+        for writer in writers:
+            writer.release()
+        client.stop_replayer(False)
+        world.apply_settings(original_settings)
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Re-render a recorded session's camera rig from the CARLA recorder")
+    parser.add_argument('session', help="recordings/<session> folder")
+    parser.add_argument('--segment', type=int, default=0, help="town segment to replay")
+    parser.add_argument('--ego', type=int, default=0, help="index of the ego to attach the rig to (multi-ego sessions)")
+    parser.add_argument('--rig', help="camera rig to render instead of the session's: a scenario JSON or a list of cameras")
+    parser.add_argument('--width', type=int, help="scale every camera to this width, keeping its aspect ratio")
+    parser.add_argument('--height', type=int, help="scale every camera to this height (with --width: fit inside the box)")
+    parser.add_argument('--fov', type=float, help="override every camera's field of view")
+    parser.add_argument('--fps', type=float, default=20.0)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=2000)
+    args = parser.parse_args()
+    sys.exit(replay(args.session, args.segment, args.ego, args.width, args.height, args.fov, args.fps,
+                    args.host, args.port, args.rig))
@@ -0,0 +1,136 @@
+# Long-run resource tracking for driving sessions: counts live actors,
+# sensors, video writers, surfaces and open file handles through registered
+# counters, samples RSS and (optionally) tracemalloc's top growing allocation
+# sites on an interval, and writes everything to resources.csv. In soak mode
+# the same town is reloaded over and over, so every count should come back to
+# the same value each cycle; the samples taken before each reload are checked
+# for a steady upward trend.
+
+import csv
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+RSS_GROWTH_MB_PER_CYCLE = 5.0  # soak tolerance for resident memory
+COUNT_GROWTH_PER_CYCLE = 0.5   # a leak of one object per reload fits a slope of 1
+MIN_SOAK_CYCLES = 5            # fewer judged cycles cannot tell a trend from noise
+
+
+def rss_mb():
+    if psutil:
+        return psutil.Process().memory_info().rss / 2**20
+    if sys.platform.startswith('linux'):
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024.0
+    return float('nan')
+
+
+def open_handles():
+    if psutil:
+        process = psutil.Process()
+        return process.num_handles() if sys.platform == 'win32' else process.num_fds()
+    if os.path.isdir('/proc/self/fd'):
+        return len(os.listdir('/proc/self/fd'))
+    return -1
+
+
+def growth_per_cycle(values):
+    # Least-squares slope over the cycle index, so one spike does not read as a trend
+    return float(np.polyfit(np.arange(len(values)), values, 1)[0])
+
+
+class ResourceTracker:
+    def __init__(self, log_path, interval=60.0, trace_allocations=False, top_n=10):
+        self.interval = interval
+        self.top_n = top_n
+        self.counters = {}
+        self.samples = []
+        self.last_sample = 0.0
+        self.log_path = log_path
+        self.log_file = None
+        self.log_writer = None
+        if trace_allocations:
+            tracemalloc.start(10)
+        self.baseline = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+
+    def add_counter(self, name, fn):
+        self.counters[name] = fn
+
+    def maybe_sample(self, now=None, label='interval'):
+        now = time.time() if now is None else now
+        if self.interval and now - self.last_sample >= self.interval:
+            self.sample(label, now)
+
+    def sample(self, label='interval', now=None):
+        now = time.time() if now is None else now
+        self.last_sample = now
+        row = {'time': now, 'label': label, 'rss_mb': rss_mb(), 'open_handles': open_handles()}
+        for name, fn in self.counters.items():
+            try:
+                row[name] = fn()
+            except RuntimeError:
+                row[name] = -1  # e.g. server unreachable mid-reload
+        if self.log_writer is None:
+            self.log_file = open(self.log_path, mode='w', newline='')
+            self.log_writer = csv.DictWriter(self.log_file, fieldnames=list(row))
+            self.log_writer.writeheader()
+        self.log_writer.writerow(row)
+        self.log_file.flush()
+        self.samples.append(row)
+        counts = ", ".join(f"{k}={v}" for k, v in row.items() if k not in ('time', 'label', 'rss_mb'))
+        print(f"[Resources] {label}: RSS {row['rss_mb']:.1f} MB, {counts}")
+        if self.baseline is not None:
+            self.print_top_allocations()
+        return row
+
+    def print_top_allocations(self):
+        # Allocation sites that grew the most since tracking started
+        stats = tracemalloc.take_snapshot().compare_to(self.baseline, 'lineno')
+        for stat in stats[:self.top_n]:
+            frame = stat.traceback[0]
+            print(f"[Resources]   {stat.size_diff / 1024:+9.1f} KiB  {stat.count_diff:+7d} blocks  {frame.filename}:{frame.lineno}")
+
+    def check_growth(self, label='reload', warmup=1, min_cycles=MIN_SOAK_CYCLES,
+                     count_tolerance=COUNT_GROWTH_PER_CYCLE, rss_tolerance=RSS_GROWTH_MB_PER_CYCLE):
+        # Every count must trend up by no more than count_tolerance per cycle and
+        # RSS by no more than rss_tolerance MB; samples must all come from the same
+        # town, since static props and traffic lights differ between maps
+        cycles = [s for s in self.samples if s['label'] == label][warmup:]
+        if len(cycles) < min_cycles:
+            print(f"[Soak] Inconclusive: {len(cycles)} '{label}' samples after warm-up, need {min_cycles}.")
+            return True
+        failures = []
+        for name in cycles[0]:
+            if name in ('time', 'label', 'rss_mb'):
+                continue
+            values = [s[name] for s in cycles if s[name] >= 0]  # -1: counter unavailable
+            if len(values) < min_cycles:
+                continue
+            slope = growth_per_cycle(values)
+            if slope > count_tolerance:
+                failures.append(f"{name} grew {values[0]} -> {values[-1]} ({slope:+.1f}/cycle)")
+        rss = [s['rss_mb'] for s in cycles]
+        rss_slope = growth_per_cycle(rss)
+        if rss_slope > rss_tolerance:
+            failures.append(f"rss_mb grew {rss_slope:.1f} MB/cycle ({rss[0]:.1f} -> {rss[-1]:.1f})")
+        for failure in failures:
+            print(f"[Soak] FAIL {failure}")
+        if not failures:
+            print(f"[Soak] PASS over {len(cycles)} cycles, RSS {rss_slope:+.1f} MB/cycle")
+        return not failures
+
+    def close(self):
+        if self.log_file:
+            self.log_file.close()
+        if self.baseline is not None:
+            tracemalloc.stop()
@@ -0,0 +1,280 @@
+# Declarative scenario files (JSON) for the driving scripts: town, weather
+# schedule, ego blueprint, sensor rig, traffic density and episode length.
+#
+#   python scenario_config.py scenarios/sweep_traffic.json --out scenarios/generated
+#       expands the "sweep" grid of a scenario into one file per combination.
+
+import argparse
+import copy
+import itertools
+import json
+import os
+
+WEATHER_PRESET_NAMES = [
+    'ClearNoon', 'CloudyNoon', 'WetNoon', 'WetCloudyNoon', 'MidRainyNoon', 'HardRainNoon', 'SoftRainNoon',
+    'ClearSunset', 'CloudySunset', 'WetSunset', 'WetCloudySunset', 'MidRainSunset', 'HardRainSunset', 'SoftRainSunset',
+]
+
+DEFAULT_CAMERA = {'x': 0.0, 'y': 0.0, 'z': 0.0, 'pitch': 0.0, 'yaw': 0.0, 'roll': 0.0, 'width': 400, 'height': 300, 'fov': 90}
+
+# Matches the rig and traffic that Final_Advance_File used to hardcode
+DEFAULT_SCENARIO = {
+    'name': 'default',
+    'town': 'Town05',
+    'weather': {
+        'presets': ['ClearNoon', 'CloudyNoon', 'WetNoon', 'MidRainyNoon', 'SoftRainNoon', 'ClearSunset'],
+        'interval': 0.0,
+        'transition': 10.0,
+        'update_hz': 2.0,
+    },
+    'ego_blueprint': 'vehicle.tesla.model3',
+    'sensors': [
+        {'name': 'Front', 'x': 1.5, 'z': 1.5, 'width': 800, 'height': 600},
+        {'name': 'Rear', 'x': -2.5, 'z': 1.5, 'yaw': 180},
+        {'name': 'Left', 'y': -1.5, 'z': 1.5, 'yaw': -90},
+        {'name': 'Right', 'y': 1.5, 'z': 1.5, 'yaw': 90},
+        {'name': 'BEV', 'z': 50, 'pitch': -90},
+    ],
+    'bev_renderer': True,
+    'bev_range': 50.0,  # meters from the ego to the nearest edge of the BEV view
+    'record_video': True,
+    'carla_recorder': False,
+    'traffic': {'vehicles': 30, 'pedestrians': 10},
+    'episode_length': 0.0,
+    # One entry per participant; control is 'joystick' (wheel index `joystick`)
+    # or 'autopilot' (Traffic Manager as a scripted agent)
+    'egos': [
+        {'name': 'ego', 'driver': '', 'control': 'joystick', 'joystick': 0},
+    ],
+    'input': {
+        'rate_hz': 250.0,
+        'latency_budget_ms': 20.0,
+        'handbrake_button': 0,
+        # 'auto' reads the wheel through evdev on Linux when installed, else pygame
+        'backend': 'auto',
+        'axes': {
+            'steer': {'axis': 0, 'deadzone': 0.1, 'exponent': 1.0, 'pedal': False},
+            'throttle': {'axis': 1, 'deadzone': 0.1, 'exponent': 1.0, 'pedal': True},
+            'brake': {'axis': 2, 'deadzone': 0.1, 'exponent': 1.0, 'pedal': True},
+        },
+    },
+}
+
+EGO_SCHEMA = {'name': str, 'driver': str, 'control': str, 'joystick': int}
+AXIS_SCHEMA = {'axis': int, 'deadzone': (int, float), 'exponent': (int, float), 'pedal': bool}
+
+SCHEMA = {
+    'name': str,
+    'town': str,
+    'weather': {'presets': list, 'interval': (int, float), 'transition': (int, float), 'update_hz': (int, float)},
+    'ego_blueprint': str,
+    'sensors': list,
+    'bev_renderer': bool,
+    'bev_range': (int, float),
+    'record_video': bool,
+    'carla_recorder': bool,
+    'traffic': {'vehicles': int, 'pedestrians': int},
+    'episode_length': (int, float),
+    'egos': list,
+    'input': {'rate_hz': (int, float), 'latency_budget_ms': (int, float), 'handbrake_button': int,
+              'backend': str, 'axes': dict},
+    'sweep': dict,
+}
+
+
+class ScenarioError(ValueError):
+    pass
+
+
+def _check_types(data, schema, path, errors):
+    for key, value in data.items():
+        where = f"{path}{key}"
+        if key not in schema:
+            errors.append(f"{where}: unknown key")
+        elif isinstance(schema[key], dict):
+            if not isinstance(value, dict):
+                errors.append(f"{where}: expected an object")
+            else:
+                _check_types(value, schema[key], where + '.', errors)
+        elif not isinstance(value, schema[key]) or (isinstance(value, bool) and schema[key] is not bool):
+            errors.append(f"{where}: expected {getattr(schema[key], '__name__', 'number')}, got {type(value).__name__}")
+
+
+def _check_sensors(sensors, errors):
+    for i, sensor in enumerate(sensors):
+        if not isinstance(sensor, dict):
+            errors.append(f"sensors[{i}]: expected an object")
+            continue
+        for key, value in sensor.items():
+            if key == 'name':
+                continue
+            if key not in DEFAULT_CAMERA:
+                errors.append(f"sensors[{i}].{key}: unknown key")
+            elif not isinstance(value, (int, float)) or isinstance(value, bool):
+                errors.append(f"sensors[{i}].{key}: expected a number")
+            elif key in ('width', 'height', 'fov') and value <= 0:
+                errors.append(f"sensors[{i}].{key}: must be > 0")
+
+
+def validate_scenario(scenario):
+    errors = []
+    _check_types(scenario, SCHEMA, '', errors)
+    if errors:
+        raise ScenarioError("Invalid scenario:\n  " + "\n  ".join(errors))
+
+    for name in scenario['weather']['presets']:
+        if name not in WEATHER_PRESET_NAMES:
+            errors.append(f"weather.presets: unknown preset '{name}'")
+    if not scenario['weather']['presets']:
+        errors.append("weather.presets: at least one preset is required")
+    for key in ('interval', 'transition'):
+        if scenario['weather'][key] < 0:
+            errors.append(f"weather.{key}: must be >= 0")
+    if scenario['weather']['update_hz'] <= 0:
+        errors.append("weather.update_hz: must be > 0 (it caps set_weather calls)")
+    _check_sensors(scenario['sensors'], errors)
+    if len(scenario['sensors']) != 5:
+        errors.append("sensors: the display layout expects exactly 5 cameras (front, rear, left, right, BEV)")
+    if scenario['bev_range'] <= 0:
+        errors.append("bev_range: must be > 0")
+    for key in ('vehicles', 'pedestrians'):
+        if scenario['traffic'][key] < 0:
+            errors.append(f"traffic.{key}: must be >= 0")
+    if scenario['episode_length'] < 0:
+        errors.append("episode_length: must be >= 0 (0 runs until quit)")
+    names = set()
+    for i, ego in enumerate(scenario['egos']):
+        if not isinstance(ego, dict):
+            errors.append(f"egos[{i}]: expected an object")
+            continue
+        _check_types(ego, EGO_SCHEMA, f"egos[{i}].", errors)
+        if ego.get('control', 'joystick') not in ('joystick', 'autopilot'):
+            errors.append(f"egos[{i}].control: expected 'joystick' or 'autopilot'")
+        if ego.get('name') in names:
+            errors.append(f"egos[{i}].name: duplicate name '{ego['name']}'")
+        names.add(ego.get('name'))
+    if not scenario['egos']:
+        errors.append("egos: at least one ego is required")
+    if scenario['input']['rate_hz'] <= 0:
+        errors.append("input.rate_hz: must be > 0")
+    if scenario['input']['backend'] not in ('auto', 'pygame'):
+        errors.append("input.backend: expected 'auto' or 'pygame'")
+    for name, axis in scenario['input']['axes'].items():
+        if name not in ('steer', 'throttle', 'brake'):
+            errors.append(f"input.axes.{name}: unknown control, expected steer, throttle or brake")
+        elif not isinstance(axis, dict):
+            errors.append(f"input.axes.{name}: expected an object")
+        else:
+            type_errors = len(errors)
+            _check_types(axis, AXIS_SCHEMA, f"input.axes.{name}.", errors)
+            if len(errors) > type_errors:
+                continue  # range checks below would compare against the wrong type
+            if not 0 <= axis.get('deadzone', 0) < 1:
+                errors.append(f"input.axes.{name}.deadzone: must be in [0, 1)")
+            if axis.get('exponent', 1) <= 0:
+                errors.append(f"input.axes.{name}.exponent: must be > 0")
+    if errors:
+        raise ScenarioError("Invalid scenario:\n  " + "\n  ".join(errors))
+    return scenario
+
+
+def _merge(base, override):
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def resolve_scenario(data):
+    # Fill in defaults for anything the file leaves out, then validate
+    scenario = _merge(DEFAULT_SCENARIO, data)
+    validate_scenario(scenario)
+    scenario['sensors'] = [dict(DEFAULT_CAMERA, **sensor) for sensor in scenario['sensors']]
+    scenario['egos'] = [dict({'name': f"ego{i}", 'driver': '', 'control': 'joystick', 'joystick': i}, **ego)
+                        for i, ego in enumerate(scenario['egos'])]
+    return scenario
+
+
+def load_rig(path):
+    # A camera rig for offline rendering: a scenario file's "sensors", or a bare
+    # list of cameras. Any number of cameras; unspecified fields use DEFAULT_CAMERA.
+    with open(path) as f:
+        data = json.load(f)
+    sensors = data.get('sensors') if isinstance(data, dict) else data
+    if not isinstance(sensors, list) or not sensors:
+        raise ScenarioError(f"{path}: expected a non-empty list of cameras, or an object with \"sensors\"")
+    errors = []
+    _check_sensors(sensors, errors)
+    if errors:
+        raise ScenarioError(f"Invalid rig {path}:\n  " + "\n  ".join(errors))
+    return [dict(DEFAULT_CAMERA, **sensor) for sensor in sensors]
+
+
+def load_scenario(path=None):
+    if path is None:
+        return resolve_scenario({})
+    with open(path) as f:
+        data = json.load(f)
+    data.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    if data.get('sweep'):
+        raise ScenarioError(f"{path} defines a sweep; expand it with scenario_config.py --out first")
+    return resolve_scenario(data)
+
+
+def _set_path(scenario, dotted, value):
+    node = scenario
+    keys = dotted.split('.')
+    for key in keys[:-1]:
+        node = node[int(key)] if isinstance(node, list) else node.setdefault(key, {})
+    if isinstance(node, list):
+        node[int(keys[-1])] = value
+    else:
+        node[keys[-1]] = value
+
+
+def expand_sweep(scenario):
+    # "sweep": {"traffic.vehicles": [0, 30, 60], "town": ["Town03", "Town05"]}
+    # yields one resolved scenario per point of the cartesian grid.
+    sweep = scenario.get('sweep') or {}
+    base = _merge(DEFAULT_SCENARIO, {k: v for k, v in scenario.items() if k != 'sweep'})
+    if not sweep:
+        return [resolve_scenario(base)]
+    keys = sorted(sweep)
+    for key in keys:
+        if not isinstance(sweep[key], list) or not sweep[key]:
+            raise ScenarioError(f"sweep.{key}: expected a non-empty list of values")
+
+    scenarios = []
+    for values in itertools.product(*(sweep[k] for k in keys)):
+        point = copy.deepcopy(base)
+        for key, value in zip(keys, values):
+            _set_path(point, key, value)
+        suffix = "_".join(f"{key.split('.')[-1]}-{value}" for key, value in zip(keys, values))
+        point['name'] = f"{base['name']}_{suffix}"
+        scenarios.append(resolve_scenario(point))
+    return scenarios
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Validate a scenario file or expand its sweep grid")
+    parser.add_argument('scenario')
+    parser.add_argument('--out', help="directory to write the expanded scenarios to")
+    args = parser.parse_args()
+
+    with open(args.scenario) as f:
+        data = json.load(f)
+    data.setdefault('name', os.path.splitext(os.path.basename(args.scenario))[0])
+    expanded = expand_sweep(data)
+    print(f"[Scenario] {args.scenario}: {len(expanded)} scenario(s)")
+    for scenario in expanded:
+        if args.out:
+            os.makedirs(args.out, exist_ok=True)
+            path = os.path.join(args.out, f"{scenario['name']}.json")
+            with open(path, 'w') as f:
+                json.dump(scenario, f, indent=2)
+            print(f"  {path}")
+        else:
+            print(f"  {scenario['name']}")
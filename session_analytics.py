@@ -0,0 +1,210 @@
+# Post-session analytics over recordings/<session>/ folders (and their
+# per-ego subfolders in multi-ego sessions): loads each
+# session's drive_log.csv and collision_log.csv as NumPy columns in a process
+# pool, computes per-session metrics and aggregates them per driver. Results
+# are cached per session by file mtime, so re-running over a growing archive
+# only processes new or changed sessions. Sessions that cannot be read are
+# reported as skipped and left out of the cache, so one bad folder does not
+# stop the run.
+#
+#   python session_analytics.py recordings/ --csv driver_metrics.csv
+
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+CACHE_FILE = '.analytics_cache.json'
+SESSION_FILES = ('drive_log.csv', 'collision_log.csv')
+HARSH_BRAKE_MS2 = 3.0      # deceleration threshold, m/s^2
+MAX_GAP_S = 1.0            # longer gaps (pauses, reloads) are not integrated
+RESAMPLE_DT = 0.1          # seconds, grid used to differentiate speed
+
+
+def read_columns(path):
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        # A log cut off mid-row (process killed before the file was closed) has a short last row
+        rows = [row for row in reader if header and len(row) == len(header)]
+    if not header:
+        return {}
+    columns = list(zip(*rows)) if rows else [()] * len(header)
+    return {name: np.array(col) for name, col in zip(header, columns)}
+
+
+def parse_clock(values):
+    # "HH:MM:SS.ffffff" -> seconds, unwrapped across midnight
+    if len(values) == 0:
+        return np.empty(0)
+    parts = np.char.split(values.astype(str), ':')
+    hms = np.array([p for p in parts], dtype=np.float64)
+    seconds = hms[:, 0] * 3600.0 + hms[:, 1] * 60.0 + hms[:, 2]
+    wraps = np.concatenate([[0], np.cumsum(np.diff(seconds) < -43200.0)])
+    return seconds + wraps * 86400.0
+
+
+def session_metrics(session_path):
+    drive = read_columns(os.path.join(session_path, 'drive_log.csv'))
+    collisions_path = os.path.join(session_path, 'collision_log.csv')
+    collisions = read_columns(collisions_path) if os.path.exists(collisions_path) else {}
+
+    t = parse_clock(drive.get('Timestamp', np.empty(0)))
+    speed = drive.get('Speed_kmh', np.empty(0)).astype(np.float64) / 3.6  # m/s
+    driver = str(drive['Driver'][0]) if len(drive.get('Driver', ())) else 'unknown'
+    metrics = {
+        'session': session_path,
+        'driver': driver,
+        'duration_s': 0.0,
+        'distance_km': 0.0,
+        'mean_speed_kmh': 0.0,
+        'peak_speed_kmh': 0.0,
+        'harsh_brakes': 0,
+        'collisions': int(len(collisions.get('Timestamp', ()))),
+        'reverse_s': 0.0,
+    }
+    if len(t) < 2:
+        return metrics
+
+    dt = np.diff(t)
+    valid = (dt > 0) & (dt <= MAX_GAP_S)
+    dt = np.where(valid, dt, 0.0)
+    duration = dt.sum()
+    distance = np.sum(0.5 * (speed[1:] + speed[:-1]) * dt)
+
+    # Resample so deceleration isn't dominated by per-frame jitter
+    grid = np.arange(t[0], t[-1], RESAMPLE_DT)
+    decel = -np.diff(np.interp(grid, t, speed)) / RESAMPLE_DT
+    # Drop steps that interpolate across a gap: after a town reload the ego respawns
+    # at 0 km/h, which would otherwise read as a stop from full speed
+    interval = np.clip(np.searchsorted(t, grid, side='right') - 1, 0, len(valid) - 1)
+    harsh = (decel > HARSH_BRAKE_MS2) & valid[interval[:-1]] & valid[interval[1:]]
+    harsh_events = int(np.count_nonzero(harsh[1:] & ~harsh[:-1]) + (harsh[0] if len(harsh) else 0))
+
+    reverse_s = 0.0
+    if 'Reverse' in drive:
+        reverse = np.isin(drive['Reverse'], ('1', 'True', 'true'))
+        reverse_s = float(np.sum(dt[reverse[:-1]]))
+
+    metrics.update(
+        duration_s=float(duration),
+        distance_km=float(distance / 1000.0),
+        mean_speed_kmh=float(distance / duration * 3.6) if duration > 0 else 0.0,
+        peak_speed_kmh=float(speed.max() * 3.6),
+        harsh_brakes=harsh_events,
+        reverse_s=reverse_s,
+    )
+    return metrics
+
+
+def try_session_metrics(session_path):
+    # Runs in the worker: one unreadable session is reported, not raised out of pool.map
+    try:
+        return session_metrics(session_path), None
+    except (OSError, ValueError, KeyError, IndexError, csv.Error) as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def session_mtimes(session_path):
+    return {name: os.path.getmtime(os.path.join(session_path, name))
+            for name in SESSION_FILES if os.path.exists(os.path.join(session_path, name))}
+
+
+def find_sessions(root):
+    # recordings/<session>/drive_log.csv, or recordings/<session>/<ego>/drive_log.csv
+    found = []
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if not os.path.isdir(path):
+            continue
+        if os.path.exists(os.path.join(path, 'drive_log.csv')):
+            found.append(path)
+        else:
+            found.extend(os.path.join(path, sub) for sub in os.listdir(path)
+                         if os.path.exists(os.path.join(path, sub, 'drive_log.csv')))
+    return sorted(found)
+
+
+def analyze(root, workers=None, use_cache=True):
+    cache_path = os.path.join(root, CACHE_FILE)
+    cache = {}
+    if use_cache and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+
+    sessions = find_sessions(root)
+    mtimes = {path: session_mtimes(path) for path in sessions}
+    keys = {path: os.path.relpath(path, root) for path in sessions}
+    stale = [path for path in sessions
+             if cache.get(keys[path], {}).get('mtimes') != mtimes[path]]
+    skipped = {}
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, (metrics, error) in zip(stale, pool.map(try_session_metrics, stale, chunksize=8)):
+                if error:
+                    skipped[path] = error
+                    cache.pop(keys[path], None)
+                    continue
+                metrics['session'] = keys[path]
+                cache[keys[path]] = {'mtimes': mtimes[path], 'metrics': metrics}
+
+    live = set(keys.values())
+    cache = {name: entry for name, entry in cache.items() if name in live}
+    if use_cache:
+        with open(cache_path, 'w') as f:
+            json.dump(cache, f)
+    print(f"[Analytics] {len(sessions)} sessions, {len(stale) - len(skipped)} processed, "
+          f"{len(sessions) - len(stale)} from cache, {len(skipped)} skipped")
+    for path, error in skipped.items():
+        print(f"[Analytics] Skipped {keys[path]}: {error}")
+    return [cache[keys[path]]['metrics'] for path in sessions if path not in skipped]
+
+
+def driver_metrics(sessions):
+    drivers = sorted({s['driver'] for s in sessions})
+    names = np.array([s['driver'] for s in sessions])
+    table = {key: np.array([s[key] for s in sessions], dtype=np.float64)
+             for key in ('duration_s', 'distance_km', 'peak_speed_kmh', 'harsh_brakes', 'collisions', 'reverse_s')}
+    results = []
+    for driver in drivers:
+        mask = names == driver
+        duration = table['duration_s'][mask].sum()
+        distance = table['distance_km'][mask].sum()
+        collisions = table['collisions'][mask].sum()
+        results.append({
+            'driver': driver,
+            'sessions': int(mask.sum()),
+            'hours': duration / 3600.0,
+            'distance_km': distance,
+            'mean_speed_kmh': distance / (duration / 3600.0) if duration > 0 else 0.0,
+            'peak_speed_kmh': table['peak_speed_kmh'][mask].max(),
+            'harsh_brakes': int(table['harsh_brakes'][mask].sum()),
+            'collisions': int(collisions),
+            'collisions_per_100km': collisions / distance * 100.0 if distance > 0 else 0.0,
+            'reverse_s': table['reverse_s'][mask].sum(),
+        })
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Per-driver metrics over recorded sessions")
+    parser.add_argument('root', nargs='?', default='recordings')
+    parser.add_argument('--workers', type=int, help="process pool size (default: CPU count)")
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--csv', help="write the per-driver table to this file")
+    args = parser.parse_args()
+
+    results = driver_metrics(analyze(args.root, args.workers, not args.no_cache))
+    columns = ['driver', 'sessions', 'hours', 'distance_km', 'mean_speed_kmh', 'peak_speed_kmh',
+               'harsh_brakes', 'collisions', 'collisions_per_100km', 'reverse_s']
+    print(" | ".join(columns))
+    for row in results:
+        print(" | ".join(f"{row[c]:.2f}" if isinstance(row[c], float) else str(row[c]) for c in columns))
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(results)
@@ -0,0 +1,54 @@
+# Server-side CARLA recorder alongside our telemetry. Every town segment of a
+# session gets its own recorder file (the recorder covers a single map), and
+# recordings/<session>/session.json links those files to the session's logs
+# so replay_session.py can re-render any camera rig offline.
+
+import datetime
+import json
+import os
+
+EGO_ROLE_NAME = 'hero'
+METADATA_FILE = 'session.json'
+
+
+class SessionRecorder:
+    def __init__(self, client, session_path, enabled=True, **metadata):
+        self.client = client
+        self.session_path = session_path
+        self.enabled = enabled
+        self.active = None
+        self.metadata = dict(metadata, session=os.path.basename(session_path), ego_role_name=EGO_ROLE_NAME,
+                             started_at=datetime.datetime.now().isoformat(), segments=[])
+        self.save()
+
+    def start_segment(self, town_name):
+        self.stop_segment()
+        if not self.enabled:
+            return
+        index = len(self.metadata['segments'])
+        # Absolute path so the server writes next to our logs (server on the same machine);
+        # a remote server stores it under its own Saved/ folder with this file name
+        recorder_file = os.path.abspath(os.path.join(self.session_path, f"carla_recorder_{index:02d}_{town_name}.log"))
+        info = self.client.start_recorder(recorder_file, True)
+        self.active = {'town': town_name, 'recorder_file': recorder_file,
+                       'started_at': datetime.datetime.now().isoformat(), 'server_reply': info}
+        self.metadata['segments'].append(self.active)
+        self.save()
+        print(f"[Recorder] Recording {town_name} to {recorder_file}")
+
+    def stop_segment(self):
+        if not self.active:
+            return
+        self.client.stop_recorder()
+        self.active['stopped_at'] = datetime.datetime.now().isoformat()
+        self.active = None
+        self.save()
+
+    def save(self):
+        with open(os.path.join(self.session_path, METADATA_FILE), 'w') as f:
+            json.dump(self.metadata, f, indent=2)
+
+
+def load_session_metadata(session_path):
+    with open(os.path.join(session_path, METADATA_FILE)) as f:
+        return json.load(f)
@@ -0,0 +1,46 @@
+# Wall-clock timing of startup phases, including phases that run on a
+# background thread, printed as a table with --profile-startup. After
+# finish() phases are no longer recorded, so code shared with later reloads
+# does not grow the table for the rest of the session.
+
+import contextlib
+import threading
+import time
+
+
+class StartupProfiler:
+    def __init__(self, origin=None):
+        # origin: a perf_counter() taken before the heavy imports, so they count
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases = []  # (name, thread, start offset, duration)
+        self.lock = threading.Lock()
+        self.finished = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if self.finished is not None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def record(self, name, start, end):
+        # For spans that cannot be wrapped in phase(), such as module imports
+        if self.finished is not None:
+            return
+        with self.lock:
+            self.phases.append((name, threading.current_thread().name, start - self.origin, end - start))
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def report(self):
+        total = (self.finished or time.perf_counter()) - self.origin
+        print(f"[Startup] {'phase':<20} {'thread':<16} {'start s':>8} {'took s':>8}")
+        for name, thread, offset, duration in sorted(self.phases, key=lambda p: p[2]):
+            print(f"[Startup] {name:<20} {thread:<16} {offset:8.3f} {duration:8.3f}")
+        busy = sum(duration for _, _, _, duration in self.phases)
+        print(f"[Startup] total {total:.3f} s wall, {busy:.3f} s summed over phases")
@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip('carla')
+pytest.importorskip('pygame')
+
+from input_poller import AxisMapping  # noqa: E402
+
+
+def test_values_inside_the_deadzone_are_zero():
+    steer = AxisMapping(0, deadzone=0.1)
+    assert steer(0.05) == 0.0
+    assert steer(-0.09) == 0.0
+
+
+def test_output_is_rescaled_past_the_deadzone():
+    steer = AxisMapping(0, deadzone=0.1)
+    assert steer(0.1) == pytest.approx(0.0)
+    assert steer(0.55) == pytest.approx(0.5)
+    assert steer(-1.0) == pytest.approx(-1.0)
+
+
+def test_exponent_shapes_the_curve_and_keeps_the_sign():
+    steer = AxisMapping(0, deadzone=0.0, exponent=2.0)
+    assert steer(0.5) == pytest.approx(0.25)
+    assert steer(-0.5) == pytest.approx(-0.25)
+
+
+def test_pedals_rest_at_plus_one():
+    throttle = AxisMapping(1, deadzone=0.1, pedal=True)
+    assert throttle(1.0) == 0.0
+    assert throttle(-1.0) == pytest.approx(1.0)
+    assert throttle(0.0) == pytest.approx((0.5 - 0.1) / 0.9)
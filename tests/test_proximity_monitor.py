@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from proximity_monitor import COLLISION_COURSE_MISS, NEAR_MISS_CLEARANCE, compute_proximity
+
+CAR = (2.3, 0.95, 0.75)
+PEDESTRIAN = (0.19, 0.19, 0.9)
+
+
+def proximity(position, velocity, yaw=0.0, extent=CAR, ego_velocity=(0.0, 0.0, 0.0)):
+    clearance, ttc, miss = compute_proximity(np.zeros(3), np.array(ego_velocity), 0.0, CAR,
+                                             np.array([position], dtype=float), np.array([velocity], dtype=float),
+                                             np.array([yaw]), np.array([extent]))
+    return clearance[0], ttc[0], miss[0]
+
+
+def test_head_on_is_a_collision_course():
+    clearance, ttc, miss = proximity((30.0, 0.0, 0.0), (-25.0, 0.0, 0.0), yaw=180.0)
+    assert ttc == pytest.approx((30.0 - 2 * CAR[0]) / 25.0)
+    assert miss < COLLISION_COURSE_MISS
+    assert clearance == pytest.approx(30.0 - 2 * CAR[0])
+
+
+@pytest.mark.parametrize('gap, ego_speed', [(10.0, 10.0), (3.0, 3.0)])
+def test_rear_end_ttc_is_time_to_contact(gap, ego_speed):
+    # Ego closing on a stopped car: contact when the gap is used up, not when centres meet
+    clearance, ttc, miss = proximity((2 * CAR[0] + gap, 0.0, 0.0), (0.0, 0.0, 0.0), ego_velocity=(ego_speed, 0.0, 0.0))
+    assert clearance == pytest.approx(gap)
+    assert ttc == pytest.approx(1.0)
+
+
+def test_oncoming_car_in_next_lane_has_no_ttc():
+    clearance, ttc, miss = proximity((30.0, 3.5, 0.0), (-25.0, 0.0, 0.0), yaw=180.0)
+    assert ttc == np.inf
+    assert miss == pytest.approx(3.5 - 2 * CAR[1])
+
+
+def test_clearance_is_between_boxes():
+    # Nose to tail with a 1 m gap is close; a pedestrian on the sidewalk is not
+    assert proximity((2 * CAR[0] + 1.0, 0.0, 0.0), (0.0, 0.0, 0.0))[0] == pytest.approx(1.0)
+    assert proximity((0.0, 2.8, 0.0), (0.0, 0.0, 0.0), extent=PEDESTRIAN)[0] > NEAR_MISS_CLEARANCE
+
+
+def test_receding_actor_has_no_ttc():
+    clearance, ttc, miss = proximity((10.0, 0.0, 0.0), (5.0, 0.0, 0.0))
+    assert ttc == np.inf
+    assert miss == pytest.approx(clearance)
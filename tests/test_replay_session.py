@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip('carla')
+pytest.importorskip('cv2')
+
+from replay_session import fit_size  # noqa: E402
+
+
+def test_sizes_keep_each_cameras_aspect_ratio():
+    assert fit_size(800, 600, 1920, 1080) == (1440, 1080)
+    assert fit_size(400, 300, 1920, 1080) == (1440, 1080)
+    assert fit_size(1280, 720, 1920, 1080) == (1920, 1080)
+
+
+def test_a_single_dimension_scales_the_other():
+    assert fit_size(400, 300, max_width=1000) == (1000, 750)
+    assert fit_size(400, 300, max_height=1080) == (1440, 1080)
+    assert fit_size(400, 300) == (400, 300)
+
+
+def test_sizes_are_even():
+    width, height = fit_size(400, 300, max_width=333)
+    assert width % 2 == 0 and height % 2 == 0
+    assert abs(width - 333) <= 1
@@ -0,0 +1,65 @@
+import csv
+
+import pytest
+
+from resource_tracker import MIN_SOAK_CYCLES, ResourceTracker
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = ResourceTracker(str(tmp_path / 'resources.csv'), interval=60.0)
+    yield tracker
+    tracker.close()
+
+
+def add_cycles(tracker, rss, **counters):
+    for i, value in enumerate(rss):
+        row = {'time': float(i), 'label': 'reload', 'rss_mb': value, 'open_handles': 40}
+        row.update({name: values[i] for name, values in counters.items()})
+        tracker.samples.append(row)
+
+
+def test_steady_counts_with_noise_pass(tracker):
+    # Warm-up cycle, then traffic spawns succeeding a little differently each reload
+    add_cycles(tracker, [300, 410, 412, 409, 415, 411, 413],
+               server_actors=[150, 212, 209, 214, 210, 211, 208], video_writers=[5] * 7)
+    assert tracker.check_growth()
+
+
+def test_one_leaked_object_per_reload_fails(tracker, capsys):
+    add_cycles(tracker, [400] * 7, video_writers=[5, 5, 10, 15, 20, 25, 30])
+    assert not tracker.check_growth()
+    assert "FAIL video_writers grew 5 -> 30" in capsys.readouterr().out
+
+
+def test_rss_trend_fails_but_a_single_spike_does_not(tracker):
+    add_cycles(tracker, [300, 400, 400, 480, 400, 400, 400], threads=[12] * 7)
+    assert tracker.check_growth()
+    tracker.samples.clear()
+    add_cycles(tracker, [300 + 20 * i for i in range(7)], threads=[12] * 7)
+    assert not tracker.check_growth()
+
+
+def test_too_few_cycles_are_inconclusive(tracker, capsys):
+    # A short series like this one used to be reported as a leak
+    add_cycles(tracker, [400] * 4, server_actors=[210, 140, 150, 230])
+    assert MIN_SOAK_CYCLES > 3
+    assert tracker.check_growth()
+    assert "Inconclusive" in capsys.readouterr().out
+
+
+def test_unavailable_counter_samples_are_ignored(tracker):
+    add_cycles(tracker, [400] * 7, server_actors=[200, 200, -1, 200, -1, 200, 200])
+    assert tracker.check_growth(min_cycles=4)
+
+
+def test_sample_writes_counters_to_csv(tmp_path, tracker):
+    counts = iter([3, 4])
+    tracker.add_counter('egos', lambda: next(counts))
+    tracker.sample('reload', now=1.0)
+    tracker.maybe_sample(now=30.0)   # inside the interval
+    tracker.maybe_sample(now=61.0)
+    tracker.log_file.flush()
+    with open(tmp_path / 'resources.csv', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [(r['label'], r['egos']) for r in rows] == [('reload', '3'), ('interval', '4')]
@@ -0,0 +1,96 @@
+import json
+import os
+
+import pytest
+
+from scenario_config import DEFAULT_CAMERA, DEFAULT_SCENARIO, ScenarioError, expand_sweep, load_rig, load_scenario, resolve_scenario
+
+SCENARIOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scenarios')
+
+
+def test_defaults_fill_missing_keys():
+    scenario = resolve_scenario({'town': 'Town03', 'traffic': {'vehicles': 5}})
+    assert scenario['town'] == 'Town03'
+    assert scenario['traffic'] == {'vehicles': 5, 'pedestrians': DEFAULT_SCENARIO['traffic']['pedestrians']}
+    assert scenario['sensors'][1]['width'] == 400  # DEFAULT_CAMERA fills unspecified fields
+    assert scenario['egos'][0]['joystick'] == 0
+
+
+@pytest.mark.parametrize('data, message', [
+    ({'twon': 'Town03'}, "twon: unknown key"),
+    ({'traffic': {'vehicles': '30'}}, "traffic.vehicles: expected int"),
+    ({'record_video': 1}, "record_video: expected bool"),
+    ({'weather': {'presets': ['Sunny']}}, "unknown preset 'Sunny'"),
+    ({'traffic': {'pedestrians': -1}}, "traffic.pedestrians: must be >= 0"),
+    ({'weather': {'update_hz': 0}}, r"weather.update_hz: must be > 0"),
+    ({'bev_range': 0}, "bev_range: must be > 0"),
+    ({'bev_range': '50'}, "bev_range: expected number"),
+    ({'sensors': [{}]}, "exactly 5 cameras"),
+    ({'egos': [{'name': 'a'}, {'name': 'a'}]}, "duplicate name 'a'"),
+    ({'input': {'axes': {'steer': {'deadzone': 'a'}}}}, "input.axes.steer.deadzone: expected number"),
+    ({'input': {'axes': {'brake': {'exponent': None}}}}, "input.axes.brake.exponent: expected number"),
+    ({'input': {'axes': {'steer': {'deadzone': 1.0}}}}, r"input.axes.steer.deadzone: must be in \[0, 1\)"),
+    ({'input': {'backend': 'sdl'}}, "input.backend"),
+])
+def test_invalid_scenarios_are_rejected(data, message):
+    with pytest.raises(ScenarioError, match=message):
+        resolve_scenario(data)
+
+
+def test_sweep_expands_to_the_cartesian_grid():
+    scenarios = expand_sweep({'name': 'grid', 'sweep': {'traffic.vehicles': [0, 30], 'town': ['Town03', 'Town05', 'Town10HD']}})
+    assert len(scenarios) == 6
+    assert scenarios[0]['name'] == 'grid_town-Town03_vehicles-0'
+    assert {(s['town'], s['traffic']['vehicles']) for s in scenarios} == {
+        (town, n) for town in ('Town03', 'Town05', 'Town10HD') for n in (0, 30)}
+    assert all('sweep' not in s for s in scenarios)
+
+
+def test_sweep_can_index_into_lists():
+    scenarios = expand_sweep({'sweep': {'sensors.0.fov': [60, 110]}})
+    assert [s['sensors'][0]['fov'] for s in scenarios] == [60, 110]
+
+
+def test_sweep_values_must_be_a_list():
+    with pytest.raises(ScenarioError, match="sweep.town"):
+        expand_sweep({'sweep': {'town': 'Town03'}})
+
+
+def test_load_scenario_names_from_file_and_refuses_sweeps(tmp_path):
+    path = tmp_path / 'night.json'
+    path.write_text(json.dumps({'town': 'Town02'}))
+    assert load_scenario(str(path))['name'] == 'night'
+
+    path.write_text(json.dumps({'sweep': {'town': ['Town02']}}))
+    with pytest.raises(ScenarioError, match="defines a sweep"):
+        load_scenario(str(path))
+
+
+def test_shipped_scenarios_are_valid():
+    load_scenario(os.path.join(SCENARIOS, 'default.json'))
+    load_scenario(os.path.join(SCENARIOS, 'two_drivers.json'))
+    with open(os.path.join(SCENARIOS, 'sweep_traffic.json')) as f:
+        assert len(expand_sweep(json.load(f))) > 1
+
+
+def test_rig_files_take_any_number_of_cameras(tmp_path):
+    rig = load_rig(os.path.join(SCENARIOS, 'wide_rig.json'))
+    assert len(rig) == 4
+    assert rig[0]['roll'] == 0.0  # DEFAULT_CAMERA fills unspecified fields
+
+    path = tmp_path / 'rig.json'
+    path.write_text(json.dumps([{'z': 2.0, 'width': 640}]))
+    assert load_rig(str(path)) == [dict(DEFAULT_CAMERA, z=2.0, width=640)]
+
+
+@pytest.mark.parametrize('rig, message', [
+    ([], "non-empty list"),
+    ({'town': 'Town03'}, "non-empty list"),
+    ([{'zoom': 2}], r"sensors\[0\].zoom: unknown key"),
+    ([{'width': 0}], r"sensors\[0\].width: must be > 0"),
+])
+def test_invalid_rigs_are_rejected(tmp_path, rig, message):
+    path = tmp_path / 'rig.json'
+    path.write_text(json.dumps(rig))
+    with pytest.raises(ScenarioError, match=message):
+        load_rig(str(path))
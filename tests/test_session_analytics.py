@@ -0,0 +1,102 @@
+import csv
+import json
+import os
+
+import numpy as np
+import pytest
+
+from session_analytics import CACHE_FILE, analyze, driver_metrics, parse_clock, session_metrics
+
+HEADER = ["Driver", "Timestamp", "Speed_kmh", "Throttle", "Brake", "Steer", "Reverse"]
+
+
+def clock(seconds):
+    seconds %= 86400.0
+    return f"{int(seconds // 3600):02d}:{int(seconds % 3600 // 60):02d}:{seconds % 60:09.6f}"
+
+
+def write_session(folder, driver, speeds, start=12 * 3600.0, dt=0.1, collisions=0, reverse=()):
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, 'drive_log.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for i, speed in enumerate(speeds):
+            writer.writerow([driver, clock(start + i * dt), f"{speed:.2f}", "0.50", "0.00", "0.00", int(i in reverse)])
+    with open(os.path.join(folder, 'collision_log.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Driver", "Timestamp", "Other Actor", "Location X", "Location Y", "Location Z"])
+        for i in range(collisions):
+            writer.writerow([driver, clock(start + i), "vehicle.audi.tt", 0, 0, 0])
+    return str(folder)
+
+
+def test_constant_speed_session(tmp_path):
+    path = write_session(tmp_path / 's1', 'alice', [36.0] * 101, collisions=2, reverse=range(10))
+    metrics = session_metrics(path)
+    assert metrics['driver'] == 'alice'
+    assert metrics['duration_s'] == pytest.approx(10.0)
+    assert metrics['distance_km'] == pytest.approx(0.1)
+    assert metrics['mean_speed_kmh'] == pytest.approx(36.0)
+    assert metrics['collisions'] == 2
+    assert metrics['harsh_brakes'] == 0
+    assert metrics['reverse_s'] == pytest.approx(1.0)
+
+
+def test_clock_unwraps_across_midnight():
+    seconds = parse_clock(np.array([clock(86399.9), clock(86400.0), clock(86400.1)]))
+    assert seconds[2] - seconds[0] == pytest.approx(0.2)
+
+
+def test_hard_stop_counts_one_harsh_brake(tmp_path):
+    # 72 km/h to 0 in 1 s is 20 m/s^2, well over the threshold
+    speeds = [72.0] * 20 + [72.0 - 7.2 * i for i in range(11)] + [0.0] * 20
+    assert session_metrics(write_session(tmp_path / 's', 'bob', speeds))['harsh_brakes'] == 1
+
+
+def test_reload_gap_is_not_a_harsh_brake(tmp_path):
+    # 10 s at 90 km/h, a 3 s town reload, then the respawned ego standing still
+    path = write_session(tmp_path / 's', 'alice', [90.0] * 101)
+    with open(os.path.join(path, 'drive_log.csv'), 'a', newline='') as f:
+        writer = csv.writer(f)
+        for i in range(50):
+            writer.writerow(['alice', clock(12 * 3600.0 + 13.0 + i * 0.1), "0.00", "0.00", "0.00", "0.00", 0])
+    metrics = session_metrics(path)
+    assert metrics['harsh_brakes'] == 0
+    assert metrics['duration_s'] == pytest.approx(10.0 + 4.9)
+
+
+def test_truncated_last_row_is_ignored(tmp_path):
+    path = write_session(tmp_path / 's', 'alice', [36.0] * 101)
+    with open(os.path.join(path, 'drive_log.csv'), 'a', newline='') as f:
+        f.write("alice,12:00:10.1")  # killed mid-write
+    assert session_metrics(path)['duration_s'] == pytest.approx(10.0)
+
+
+def test_bad_session_is_skipped_and_not_cached(tmp_path, capsys):
+    write_session(tmp_path / 'good', 'alice', [36.0] * 101)
+    bad = write_session(tmp_path / 'bad', 'bob', [36.0] * 5)
+    with open(os.path.join(bad, 'drive_log.csv'), 'a', newline='') as f:
+        f.write("bob,not-a-time,1,0,0,0,0\n")
+
+    sessions = analyze(str(tmp_path), workers=1)
+    assert [s['session'] for s in sessions] == ['good']
+    assert "Skipped bad" in capsys.readouterr().out
+    with open(tmp_path / CACHE_FILE) as f:
+        assert list(json.load(f)) == ['good']
+
+
+def test_multi_ego_sessions_and_cache(tmp_path, capsys):
+    write_session(tmp_path / 'session' / 'ego0', 'alice', [36.0] * 101)
+    write_session(tmp_path / 'session' / 'ego1', 'bob', [72.0] * 101, collisions=1)
+    write_session(tmp_path / 'older', 'alice', [36.0] * 101)
+
+    sessions = analyze(str(tmp_path), workers=1)
+    assert sorted(s['session'] for s in sessions) == ['older', os.path.join('session', 'ego0'), os.path.join('session', 'ego1')]
+    assert "3 processed, 0 from cache" in capsys.readouterr().out
+    analyze(str(tmp_path), workers=1)
+    assert "0 processed, 3 from cache" in capsys.readouterr().out
+
+    drivers = {row['driver']: row for row in driver_metrics(sessions)}
+    assert drivers['alice']['sessions'] == 2
+    assert drivers['alice']['distance_km'] == pytest.approx(0.2)
+    assert drivers['bob']['collisions_per_100km'] == pytest.approx(1 / 0.2 * 100.0)
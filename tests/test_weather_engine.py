@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from weather_engine import WEATHER_FIELDS, WeatherEngine, interpolate_weather
+
+AZIMUTH = WEATHER_FIELDS.index('sun_azimuth_angle')
+
+
+def fields(**values):
+    return np.array([values.get(name, 0.0) for name in WEATHER_FIELDS], dtype=np.float64)
+
+
+def test_blend_is_linear_and_clamped():
+    start, end = fields(cloudiness=0.0), fields(cloudiness=80.0)
+    assert interpolate_weather(start, end, 0.25)[0] == pytest.approx(20.0)
+    assert interpolate_weather(start, end, 2.0)[0] == pytest.approx(80.0)
+    assert interpolate_weather(start, end, -1.0)[0] == pytest.approx(0.0)
+
+
+def test_azimuth_takes_the_short_way_round():
+    start, end = fields(sun_azimuth_angle=350.0), fields(sun_azimuth_angle=20.0)
+    assert interpolate_weather(start, end, 0.5)[AZIMUTH] == pytest.approx(5.0)
+    assert interpolate_weather(start, end, 1.0)[AZIMUTH] == pytest.approx(20.0)
+    assert interpolate_weather(end, start, 0.5)[AZIMUTH] == pytest.approx(5.0)
+
+
+class _Weather:
+    def __init__(self, **values):
+        for name in WEATHER_FIELDS:
+            setattr(self, name, values.get(name, 0.0))
+
+
+class _World:
+    def __init__(self):
+        self.weather = _Weather()
+        self.calls = 0
+
+    def get_weather(self):
+        return self.weather
+
+    def set_weather(self, weather):
+        self.calls += 1
+
+
+def test_set_weather_is_rate_limited_and_skipped_when_idle():
+    world = _World()
+    engine = WeatherEngine(world, [_Weather(), _Weather(cloudiness=100.0)], transition=10.0, update_hz=2.0)
+    engine.set_world(world, now=0.0)
+    calls_at_start = world.calls
+    engine.next_preset(now=0.0)
+    for frame in range(60 * 20):  # 20 s at 60 FPS, blend finishes at 10 s
+        engine.update(frame / 60.0)
+    assert world.weather.cloudiness == pytest.approx(100.0)
+    assert world.calls - calls_at_start <= 10 * 2 + 1
+
+
+def test_update_rate_must_be_positive():
+    with pytest.raises(ValueError, match="update_hz"):
+        WeatherEngine(_World(), [_Weather()], update_hz=0)
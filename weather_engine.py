@@ -0,0 +1,127 @@
+# Smooth weather: interpolates WeatherParameters fields between presets over
+# time instead of jumping, and rate-limits world.set_weather calls so long
+# sessions get continuous weather / day cycles at a bounded RPC cost.
+# Run this file directly to measure the per-update cost.
+
+import time
+
+import numpy as np
+
+WEATHER_FIELDS = [
+    'cloudiness', 'precipitation', 'precipitation_deposits', 'wind_intensity',
+    'sun_azimuth_angle', 'sun_altitude_angle', 'fog_density', 'fog_distance', 'wetness',
+]
+ANGLE_FIELDS = np.array([name == 'sun_azimuth_angle' for name in WEATHER_FIELDS])
+
+
+def weather_to_array(weather):
+    return np.array([getattr(weather, name) for name in WEATHER_FIELDS], dtype=np.float64)
+
+
+def interpolate_weather(start, end, alpha):
+    # Linear blend of field vectors; azimuth takes the short way round the circle
+    delta = end - start
+    delta[ANGLE_FIELDS] = (delta[ANGLE_FIELDS] + 180.0) % 360.0 - 180.0
+    blended = start + delta * min(max(alpha, 0.0), 1.0)
+    blended[ANGLE_FIELDS] %= 360.0
+    return blended
+
+
+class WeatherEngine:
+    def __init__(self, world, presets, interval=0.0, transition=10.0, update_hz=2.0):
+        # presets: carla.WeatherParameters, cycled every `interval` seconds
+        # (0 = only on request), each change blended over `transition` seconds.
+        self.keyframes = np.stack([weather_to_array(p) for p in presets])
+        self.interval = interval
+        self.transition = transition
+        if update_hz <= 0:
+            raise ValueError("update_hz must be > 0: it is what bounds the set_weather RPC rate")
+        self.min_period = 1.0 / update_hz
+        self.index = 0
+        self.current = self.keyframes[0].copy()
+        self.applied = None
+        self.segment = None  # (start values, end values, start time, duration)
+        self.next_change = None
+        self.last_update = 0.0
+        self.updates = 0
+        self.set_weather_calls = 0
+        self.update_time = 0.0
+        self.set_world(world)
+
+    def set_world(self, world, now=None):
+        # After a town reload the new world starts from the current blend
+        self.world = world
+        self.weather = world.get_weather()
+        self.applied = None
+        now = time.time() if now is None else now
+        self.next_change = now + self.interval if self.interval else None
+        self._apply(now)
+
+    def next_preset(self, now=None):
+        now = time.time() if now is None else now
+        self.index = (self.index + 1) % len(self.keyframes)
+        self.segment = (self.current.copy(), self.keyframes[self.index], now, self.transition)
+        if self.interval:
+            self.next_change = now + self.interval
+        return self.index
+
+    def update(self, now=None):
+        start = time.perf_counter()
+        now = time.time() if now is None else now
+        if self.next_change is not None and now >= self.next_change:
+            self.next_preset(now)
+        if self.segment:
+            seg_start, seg_end, t0, duration = self.segment
+            alpha = (now - t0) / duration if duration > 0 else 1.0
+            self.current = interpolate_weather(seg_start, seg_end, alpha)
+            if alpha >= 1.0:
+                self.segment = None
+        if now - self.last_update >= self.min_period:
+            self._apply(now)
+        self.updates += 1
+        self.update_time += time.perf_counter() - start
+
+    def _apply(self, now):
+        self.last_update = now
+        # Skip the RPC when nothing visible changed since the last call
+        if self.applied is not None and np.abs(self.current - self.applied).max() < 1e-2:
+            return
+        for name, value in zip(WEATHER_FIELDS, self.current):
+            setattr(self.weather, name, float(value))
+        self.world.set_weather(self.weather)
+        self.applied = self.current.copy()
+        self.set_weather_calls += 1
+
+    def stats(self):
+        mean_us = 1e6 * self.update_time / self.updates if self.updates else 0.0
+        return f"{self.updates} updates, {self.set_weather_calls} set_weather calls, {mean_us:.1f} us/update"
+
+
+def benchmark(seconds=600.0, fps=60, update_hz=2.0):
+    # Simulated clock against a fake world; set_weather is counted, not sent
+    class _Weather:
+        def __init__(self, **fields):
+            for name in WEATHER_FIELDS:
+                setattr(self, name, fields.get(name, 0.0))
+
+    class _World:
+        def __init__(self):
+            self.weather = _Weather()
+
+        def get_weather(self):
+            return self.weather
+
+        def set_weather(self, weather):
+            pass
+
+    presets = [_Weather(cloudiness=c, precipitation=p, sun_altitude_angle=a, sun_azimuth_angle=z, wetness=w)
+               for c, p, a, z, w in ((10, 0, 45, 350, 0), (80, 0, 30, 20, 0), (90, 60, 15, 90, 50), (20, 0, -10, 180, 10))]
+    engine = WeatherEngine(_World(), presets, interval=60.0, transition=20.0, update_hz=update_hz)
+    engine.set_world(engine.world, now=0.0)
+    for frame in range(int(seconds * fps)):
+        engine.update(frame / fps)
+    print(f"[Benchmark] {seconds:.0f} s at {fps} FPS, {update_hz} Hz cap: {engine.stats()}")
+
+
+if __name__ == '__main__':
+    benchmark()